@@ -0,0 +1,138 @@
+"""
+Offline benchmark for CurriculumCrew against the local mock LLM server.
+
+Measures single-run latency (sequential and fan-out), concurrent throughput,
+peak Python memory per run and Python-side orchestration overhead (a run
+against an instant mock, where every millisecond is ours), then optionally
+compares against a stored baseline:
+
+    python benchmarks/bench_crew.py --profile fast --runs 3
+    python benchmarks/bench_crew.py --save benchmarks/baseline.json
+    python benchmarks/bench_crew.py --baseline benchmarks/baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.mock_server import PROFILES, MockProfile, start_mock_server
+
+COURSE = ("Introduction to Data Ethics", "Non-technical managers in fintech startups")
+
+# Metrics where a larger value is better; everything else is lower-is-better.
+HIGHER_IS_BETTER = {"throughput_courses_per_min", "prompt_cache_hit_rate"}
+
+
+def _configure(base_url: str) -> None:
+    # Must happen before the first agent (and so get_llm) is built.
+    os.environ.update({
+        "LLM_MODEL": "openai/mock-curriculum",
+        "DEEPSEEK_API_KEY": "mock",
+        "DEEPSEEK_BASE_URL": base_url,
+        "LLM_CACHE": "0",
+        # Timed runs repeat one course; the store would answer them from SQLite
+        # (and the benchmark would write to the user's store)
+        "CURRICULUM_STORE": "0",
+        "CREW_VERBOSE": "0",
+    })
+
+
+def _timed(crew, course=COURSE) -> float:
+    started = time.perf_counter()
+    crew.generate_curriculum(*course)
+    return time.perf_counter() - started
+
+
+def run(profile: str, runs: int, concurrency: int, batch: int) -> dict:
+    server, base_url = start_mock_server(profile)
+    _configure(base_url)
+    from src.crew import CurriculumCrew
+
+    results = {"profile": profile, "runs": runs}
+    try:
+        # Warm-up builds the agents and imports crewai so they are not timed.
+        CurriculumCrew(mode="sequential").generate_curriculum(*COURSE)
+
+        for mode in ("sequential", "fanout"):
+            latencies = [_timed(CurriculumCrew(mode=mode)) for _ in range(runs)]
+            results[f"{mode}_latency_s"] = round(statistics.median(latencies), 4)
+
+        tracemalloc.start()
+        _timed(CurriculumCrew(mode="sequential"))
+        results["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 3)
+        tracemalloc.stop()
+
+        courses = [(f"{COURSE[0]} #{i}", COURSE[1]) for i in range(batch)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda c: _timed(CurriculumCrew(mode="sequential"), c), courses))
+        elapsed = time.perf_counter() - started
+        results["throughput_courses_per_min"] = round(batch / elapsed * 60, 2)
+
+        # With an instant server the whole wall time is orchestration overhead.
+        server.profile = MockProfile(**{**asdict(PROFILES["instant"]), "seed": server.profile.seed})
+        overhead = [_timed(CurriculumCrew(mode="sequential")) for _ in range(runs)]
+        results["python_overhead_s"] = round(statistics.median(overhead), 4)
+        results["server"] = dict(server.stats)
+        # Share of prompt tokens served from the mock's prefix cache
+        results["prompt_cache_hit_rate"] = round(
+            server.stats["cached_tokens"] / max(server.stats["prompt_tokens"], 1), 4
+        )
+    finally:
+        server.shutdown()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    ok = True
+    for metric, value in baseline.items():
+        if not isinstance(value, (int, float)) or metric == "runs" or metric not in results:
+            continue
+        current = results[metric]
+        if metric in HIGHER_IS_BETTER:
+            regressed = current < value * (1 - tolerance)
+        else:
+            regressed = current > value * (1 + tolerance)
+        change = (current - value) / value * 100 if value else 0.0
+        print(f"  {'❌' if regressed else '✅'} {metric:<28} {value:>10} -> {current:>10} ({change:+.1f}%)")
+        ok = ok and not regressed
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CurriculumCrew against the local mock LLM.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--save", help="write results to this baseline file")
+    parser.add_argument("--baseline", help="compare against this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run(args.profile, args.runs, args.concurrency, args.batch)
+    print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Comparing against {args.baseline} (tolerance {args.tolerance:.0%})")
+        if not compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
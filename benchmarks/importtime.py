@@ -0,0 +1,84 @@
+"""
+Cold-start benchmark for the CLI entry point.
+
+Runs ``python -X importtime -c "import src.run_demo"`` in fresh interpreters
+and reports the total import time plus the slowest modules. With ``--baseline``
+the result is compared against a stored JSON file and the script exits
+non-zero when the median regresses by more than ``--tolerance``:
+
+    python benchmarks/importtime.py --runs 5
+    python benchmarks/importtime.py --save benchmarks/importtime_baseline.json
+    python benchmarks/importtime.py --baseline benchmarks/importtime_baseline.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str):
+    """Return (total_us, {module: cumulative_us}) for one cold import of ``module``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    cumulative = {}
+    total = 0
+    for match in _LINE.finditer(proc.stderr):
+        us, name, indent = int(match.group(2)), match.group(4), len(match.group(3))
+        cumulative[name] = us
+        if indent == 1:  # top-level imports only, nested ones are already included
+            total += us
+    return total, cumulative
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="src.run_demo")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--save", help="write the result to this baseline file")
+    parser.add_argument("--baseline", help="compare against this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    totals, slowest = [], {}
+    for _ in range(args.runs):
+        total, cumulative = measure(args.module)
+        totals.append(total)
+        for name, us in cumulative.items():
+            slowest[name] = min(us, slowest.get(name, us))
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"{args.module}: median {median_ms:.1f} ms over {args.runs} cold imports "
+          f"(min {min(totals) / 1000:.1f}, max {max(totals) / 1000:.1f})")
+    for name, us in sorted(slowest.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    result = {"module": args.module, "median_ms": round(median_ms, 2), "runs": args.runs}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        limit = baseline["median_ms"] * (1 + args.tolerance)
+        print(f"Baseline {baseline['median_ms']:.1f} ms, limit {limit:.1f} ms")
+        if median_ms > limit:
+            print("❌ Cold-start regression")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
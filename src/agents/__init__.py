@@ -1,4 +1,55 @@
-from .objective_agent import objective_agent
-from .lesson_agent import lesson_agent
-from .assessment_agent import assessment_agent
-from .review_agent import review_agent
+"""
+Lazy agent registry.
+
+Agents (and crewai itself) are only built the first time they are asked for,
+so importing ``src.crew`` stays cheap for callers that never run a crew.
+``from src.agents import objective_agent`` keeps working and returns the
+shared instance.
+"""
+
+import importlib
+import threading
+
+AGENT_NAMES = ("objective", "lesson", "assessment", "review", "translation")
+
+_agents = {}
+_lock = threading.Lock()
+
+
+def get_agent(name: str):
+    if name not in AGENT_NAMES:
+        raise KeyError(f"unknown agent {name!r}; expected one of {', '.join(AGENT_NAMES)}")
+    agent = _agents.get(name)
+    if agent is None:
+        with _lock:
+            agent = _agents.get(name)
+            if agent is None:
+                module = importlib.import_module(f".{name}_agent", __name__)
+                # Importing the submodule binds it as a package attribute,
+                # which would shadow the agent for ``from src.agents import ...``.
+                globals().pop(f"{name}_agent", None)
+                agent = getattr(module, f"create_{name}_agent")()
+                _check_llm(name, agent)
+                _agents[name] = agent
+    return agent
+
+
+def _check_llm(name: str, agent) -> None:
+    # On crewai 1.x, LLM() is a factory that can return a native provider
+    # client instead of our subclass, silently bypassing the response cache,
+    # scheduler, tracing and routing in src/llm.py.
+    from ..llm import CachedLLM, RoutedLLM
+
+    llm = agent.llm
+    targets = [target for target, _ in llm.targets] if isinstance(llm, RoutedLLM) else [llm]
+    if not all(isinstance(target, CachedLLM) for target in targets):
+        raise RuntimeError(
+            f"the {name} agent's LLM is a {type(llm).__name__}, not a CachedLLM; "
+            "this crewai version is not supported (install crewai>=0.120.0,<1.0)"
+        )
+
+
+def __getattr__(attr: str):
+    if attr.endswith("_agent") and attr[: -len("_agent")] in AGENT_NAMES:
+        return get_agent(attr[: -len("_agent")])
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
@@ -1,13 +1,15 @@
-from crewai import Agent
-from ..llm import get_llm
+def create_objective_agent():
+    from crewai import Agent
+    from ..config import crew_verbose
+    from ..llm import get_llm
 
-objective_agent = Agent(
-    role="Learning Objective Specialist",
-    goal="Create clear, measurable learning objectives for any course",
-    backstory="""You are an expert instructional designer with 15+ years of experience
-    creating SMART learning objectives. You understand Bloom"s taxonomy and can craft
-    objectives that are specific, measurable, achievable, relevant, and time-bound.""",
-    llm=get_llm(),
-    verbose=True,
-    allow_delegation=False
-)
+    return Agent(
+        role="Learning Objective Specialist",
+        goal="Create clear, measurable learning objectives for any course",
+        backstory="""You are an expert instructional designer with 15+ years of experience
+        creating SMART learning objectives. You understand Bloom"s taxonomy and can craft
+        objectives that are specific, measurable, achievable, relevant, and time-bound.""",
+        llm=get_llm("objective"),
+        verbose=crew_verbose(),
+        allow_delegation=False
+    )
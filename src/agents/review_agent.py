@@ -1,13 +1,15 @@
-from crewai import Agent
-from ..llm import get_llm
+def create_review_agent():
+    from crewai import Agent
+    from ..config import crew_verbose
+    from ..llm import get_llm
 
-review_agent = Agent(
-    role="Quality Assurance Specialist",
-    goal="Ensure curriculum alignment and quality",
-    backstory="""You are a quality assurance expert who reviews curricula for alignment
-    between objectives, lessons, and assessments. You provide constructive feedback
-    and ensure high educational standards.""",
-    llm=get_llm(),
-    verbose=True,
-    allow_delegation=False
-)
+    return Agent(
+        role="Quality Assurance Specialist",
+        goal="Ensure curriculum alignment and quality",
+        backstory="""You are a quality assurance expert who reviews curricula for alignment
+        between objectives, lessons, and assessments. You provide constructive feedback
+        and ensure high educational standards.""",
+        llm=get_llm("review"),
+        verbose=crew_verbose(),
+        allow_delegation=False
+    )
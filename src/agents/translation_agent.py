@@ -0,0 +1,15 @@
+def create_translation_agent():
+    from crewai import Agent
+    from ..config import crew_verbose
+    from ..llm import get_llm
+
+    return Agent(
+        role="Curriculum Translator",
+        goal="Translate course material faithfully while keeping its structure intact",
+        backstory="""You are a professional translator of educational content. You keep the
+        meaning, tone and level of every sentence, use the terminology learners in the target
+        language expect, and never add, drop or reorder material.""",
+        llm=get_llm("translation"),
+        verbose=crew_verbose(),
+        allow_delegation=False
+    )
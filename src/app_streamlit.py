@@ -1,6 +1,7 @@
-import json
 import sys
 import os
+import time
+import uuid
 import streamlit as st
 from dotenv import load_dotenv
 
@@ -9,10 +10,44 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 load_dotenv(os.path.join(project_root, '.env'))
 
-from src.crew import CurriculumCrew
+from src.service import DONE, FAILED, CANCELLED, JobService, ServiceClient, request_key
+from src.events import CrewEvent, TASK_START, PARTIAL_OUTPUT
+from src.export import MIME_TYPES, iter_export
 
 load_dotenv()
 st.set_page_config(page_title="CrewAI Curriculum Generator", layout="wide")
+
+
+@st.cache_resource
+def get_client():
+    # The app is a thin client of the generation service (src/service.py).
+    # Without CURRICULUM_SERVICE_URL one is started in-process, shared by all sessions.
+    url = os.getenv("CURRICULUM_SERVICE_URL")
+    if not url:
+        url = JobService().start().serve(port=0)
+    return ServiceClient(url)
+
+
+@st.cache_resource
+def finished_results():
+    # (finished curriculum, time) per (course_idea, target_audience), shared by all sessions
+    return {}
+
+
+def finished_result(key):
+    # Kept for STREAMLIT_RESULT_TTL_SECONDS; "Regenerate" skips it altogether
+    ttl = float(os.getenv("STREAMLIT_RESULT_TTL_SECONDS", "3600"))
+    results = finished_results()
+    for stale in [k for k, (_, finished) in results.items() if time.time() - finished > ttl]:
+        results.pop(stale, None)
+    entry = results.get(key)
+    return entry[0] if entry else None
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def similar_curricula(course_idea, audience):
+    return get_client().similar(course_idea, audience, limit=3)
+
 st.title("🤖 CrewAI Multi-Agent Curriculum Generator")
 st.markdown("*Showcasing specialized AI agents collaborating on curriculum development*")
 
@@ -34,63 +69,9 @@ with st.expander("Meet the AI Agents"):
         st.markdown("**✅ Quality Reviewer**")
         st.markdown("Ensures alignment and maintains educational standards")
 
-course_idea = st.text_input("Course idea", value="Introduction to Data Ethics")
-audience = st.text_input("Target audience", value="Non-technical managers in fintech startups")
-generate_btn = st.button("Generate curriculum")
-
-if generate_btn and course_idea and audience:
-    crew = CurriculumCrew()
-    
-    # Create progress tracking
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    log_container = st.container()
-    
-    with log_container:
-        st.subheader("CrewAI Multi-Agent Progress")
-        workflow_logs = st.empty()
-    
-    # Initialize logs
-    logs = []
-    
-    def update_progress(step, total, message):
-        progress = step / total
-        progress_bar.progress(progress)
-        status_text.text(f"Agent {step}/{total}: {message}")
-        logs.append(f"🤖 {message}")
-        workflow_logs.text("\n".join(logs))
-    
-    try:
-        update_progress(1, 4, "Objective Agent: Analyzing course requirements...")
-        import time
-        time.sleep(1)
-        
-        update_progress(2, 4, "Lesson Designer: Creating comprehensive blueprints...")
-        time.sleep(1)
-        
-        update_progress(3, 4, "Assessment Creator: Designing aligned evaluations...")
-        time.sleep(1)
-        
-        update_progress(4, 4, "Quality Reviewer: Ensuring curriculum alignment...")
-        time.sleep(0.5)
-        
-        # Execute CrewAI workflow
-        result = crew.generate_curriculum(course_idea, audience)
-        
-        progress_bar.progress(1.0)
-        status_text.text("✅ CrewAI agents completed successfully!")
-        logs.append("✅ Multi-agent collaboration complete")
-        workflow_logs.text("\n".join(logs))
-        
-    except Exception as e:
-        st.error(f"Error during CrewAI execution: {str(e)}")
-        st.write("**Debug info:**")
-        st.write(f"Error type: {type(e).__name__}")
-        st.write(f"Error details: {str(e)}")
-        st.stop()
-
+def render_result(result):
     # Display agent collaboration details
-    agent_meta = result.package_json.get("agent_collaboration", {})
+    agent_meta = result.agent_collaboration
     if agent_meta:
         st.info(f"🤖 {agent_meta.get('agents_used', 4)} specialized agents collaborated using {agent_meta.get('workflow_type', 'sequential')} approach")
         
@@ -108,20 +89,160 @@ if generate_btn and course_idea and audience:
     with col1:
         st.subheader("Assessment Details")
         for assessment in result.assessments:
-            with st.expander(f"📝 {assessment['lesson_title']}"):
-                st.write(f"**Objective Measured:** {assessment['objective_measured']}")
-                st.write(f"**MCQs:** {len(assessment['mcqs'])}")
-                st.write(f"**Short Answer:** {assessment['short_answer']['question']}")
+            with st.expander(f"📝 {assessment.lesson_title}"):
+                st.write(f"**Objective Measured:** {assessment.objective_measured}")
+                st.write(f"**MCQs:** {len(assessment.mcqs)}")
+                if assessment.short_answer:
+                    st.write(f"**Short Answer:** {assessment.short_answer.question}")
     
     with col2:
         st.subheader("JSON Export")
         st.json(result.package_json)
+        # download_button needs the payload as bytes, so only the chosen
+        # format is exported on each rerun
+        labels = {"json": "JSON", "ndjson": "NDJSON", "md": "Markdown", "html": "HTML"}
+        fmt = st.selectbox("Download format", list(labels), format_func=labels.get, key="download-format")
         st.download_button(
-            "Download JSON",
-            data=json.dumps(result.package_json, indent=2),
-            file_name="syllabus.json",
-            mime="application/json",
+            f"Download {labels[fmt]}",
+            data=b"".join(iter_export(result, fmt)),
+            file_name=f"syllabus.{fmt}",
+            mime=MIME_TYPES[fmt],
+            key="download",
         )
 
     st.subheader("Quality Review")
     st.success(result.review_notes)
+
+
+course_idea = st.text_input("Course idea", value="Introduction to Data Ethics")
+audience = st.text_input("Target audience", value="Non-technical managers in fintech startups")
+col_generate, col_regenerate = st.columns(2)
+generate_btn = col_generate.button("Generate curriculum")
+# Bypasses every saved result (this app's, the store's and the LLM response cache)
+regenerate_btn = col_regenerate.button("Regenerate from scratch")
+session = st.session_state
+# The service client is shared by all sessions; each cancels only its own interest in a job
+requester = session.setdefault("requester", uuid.uuid4().hex)
+
+# Offer stored curricula for the same or a rephrased request before generating
+if course_idea and audience:
+    similar = similar_curricula(course_idea, audience)
+    if similar:
+        with st.expander(f"📚 {len(similar)} similar curricula already generated"):
+            for match in similar:
+                label = "exact match" if match["exact"] else f"{match['score']:.0%} similar"
+                if st.button(f"Use \"{match['course_idea']}\" for {match['target_audience']} ({label})",
+                             key=f"stored-{match['id']}"):
+                    session["result"] = get_client().stored(match["id"])
+                    session.pop("job", None)
+
+if (generate_btn or regenerate_btn) and course_idea and audience:
+    key = request_key(course_idea, audience)
+    session.pop("result", None)
+    finished = None if regenerate_btn else finished_result(key)
+    if finished is not None:
+        session["result"] = finished
+    elif regenerate_btn or session.get("job", {}).get("key") != key:
+        if session.get("job"):
+            get_client().cancel(session["job"]["id"], requester)
+        # Generation runs on the service's workers; this session only keeps
+        # the job id, so reruns and widget changes never restart it.
+        job = get_client().submit(course_idea, audience, requester=requester, fresh=regenerate_btn)
+        session["job"] = {"id": job["id"], "key": key, "since": 0, "events": []}
+
+job = session.get("job")
+if job:
+    client = get_client()
+    if st.button("Cancel generation"):
+        client.cancel(job["id"], requester)
+        session.pop("job")
+        st.warning("🛑 Generation cancelled")
+        st.stop()
+    
+    state = client.status(job["id"], job["since"])
+    job["events"].extend(state["events"])
+    job["since"] = state["next_event"]
+    
+    # Create progress tracking
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    log_container = st.container()
+    
+    with log_container:
+        st.subheader("CrewAI Multi-Agent Progress")
+        workflow_logs = st.empty()
+    
+    # Sections are filled in as each agent finishes
+    objectives_slot = st.empty()
+    lessons_slot = st.container()
+    assessments_slot = st.container()
+    
+    # Initialize logs
+    logs = []
+    stage_messages = {
+        "objectives": "Objective Agent: Analyzing course requirements...",
+        "lessons": "Lesson Designer: Creating comprehensive blueprints...",
+        "assessments": "Assessment Creator: Designing aligned evaluations...",
+        "review": "Quality Reviewer: Ensuring curriculum alignment...",
+    }
+    
+    def update_progress(step, total, message):
+        progress = step / total
+        progress_bar.progress(progress)
+        status_text.text(f"Agent {step}/{total}: {message}")
+        logs.append(f"🤖 {message}")
+        workflow_logs.text("\n".join(logs))
+    
+    # Objectives by module (None outside hierarchical mode)
+    objectives_by_module = {}
+    
+    def render_partial(event):
+        if event.stage == "objectives" and isinstance(event.data, list):
+            objectives_by_module[event.module] = event.data
+            sections = []
+            for module, objectives in sorted(objectives_by_module.items(), key=lambda item: item[0] or 0):
+                heading = f"Module {module + 1}: " if module is not None else ""
+                sections.append(f"**{heading}Learning Objectives**\n\n"
+                                + "\n".join(f"{i}. {o}" for i, o in enumerate(objectives, 1)))
+            objectives_slot.markdown("\n\n".join(sections))
+        elif event.stage == "lessons" and event.data:
+            items = event.data if isinstance(event.data, list) else [event.data]
+            for offset, lesson in enumerate(items):
+                if lesson is None:
+                    continue  # failed to parse; repaired once the crew finishes
+                number = (event.index if event.index is not None else offset) + 1
+                prefix = f"Module {event.module + 1}, " if event.module is not None else ""
+                with lessons_slot.expander(f"📚 {prefix}Lesson {number}: {lesson.get('title', '')}"):
+                    st.write(f"**Hook:** {lesson.get('hook', '')}")
+                    st.write(f"**Practice:** {lesson.get('practice', '')}")
+        elif event.stage == "assessments" and event.data:
+            items = event.data if isinstance(event.data, list) else [event.data]
+            for assessment in items:
+                if assessment is None:
+                    continue
+                with assessments_slot.expander(f"📝 {assessment.get('lesson_title', 'Assessment')}"):
+                    st.write(f"**MCQs:** {len(assessment.get('mcqs', []))}")
+    
+    # Every rerun replays the job's events so far
+    for event in map(lambda e: CrewEvent(**e), job["events"]):
+        if event.kind == TASK_START:
+            suffix = f" (item {event.index + 1})" if event.index is not None else ""
+            update_progress(event.step, 4, stage_messages[event.stage] + suffix)
+        elif event.kind == PARTIAL_OUTPUT:
+            render_partial(event)
+    
+    if state["status"] == DONE:
+        result = client.result(job["id"])
+        finished_results()[job["key"]] = (result, time.time())
+        session["result"] = result
+        session.pop("job")
+        st.rerun()
+    elif state["status"] in (FAILED, CANCELLED):
+        session.pop("job")
+        st.error(f"Error during CrewAI execution: {state['error'] or state['status']}")
+    else:
+        time.sleep(float(os.getenv("STREAMLIT_POLL_SECONDS", "0.5")))
+        st.rerun()
+elif session.get("result") is not None:
+    st.success("✅ CrewAI agents completed successfully!")
+    render_result(session["result"])
@@ -0,0 +1,168 @@
+"""
+Batch curriculum generation.
+
+Reads (course_idea, target_audience) rows from a JSONL or CSV file and runs
+several generations concurrently. Every finished syllabus is written to its
+own file straight away and recorded in a checkpoint manifest, so a killed run
+picks up where it stopped:
+
+    python -m src.batch courses.jsonl --out-dir out/ --concurrency 4
+
+``--languages French,German`` also writes a translated variant of every
+syllabus next to it (see src/translation.py).
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+load_dotenv(os.path.join(project_root, '.env'))
+
+from src.config import CurriculumTask
+from src.crew import CurriculumCrew
+from src.export import write_export
+from src.scheduler import priority_scope
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def read_tasks(path: str) -> List[CurriculumTask]:
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    return [CurriculumTask(course_idea=r["course_idea"], target_audience=r["target_audience"]) for r in rows]
+
+
+def task_id(task: CurriculumTask) -> str:
+    digest = hashlib.sha1(f"{task.course_idea}\x00{task.target_audience}".encode("utf-8")).hexdigest()[:10]
+    slug = re.sub(r"[^a-z0-9]+", "-", task.course_idea.lower()).strip("-")[:40]
+    return f"{slug}-{digest}"
+
+
+def load_manifest(out_dir: str) -> Dict[str, dict]:
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    done = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a killed run
+                if entry.get("status") == "done":
+                    done[entry["id"]] = entry
+    return done
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def language_slug(language: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", language.lower()).strip("-") or "variant"
+
+
+def run_batch(tasks: List[CurriculumTask], out_dir: str, concurrency: int = 4, mode: str = None,
+              languages: List[str] = ()) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    done = load_manifest(out_dir)
+    # Keyed by id so duplicate rows are only generated once.
+    pending = {task_id(t): t for t in tasks if task_id(t) not in done}
+    print(f"📦 {len(tasks)} courses, {len(done)} already done, {len(pending)} to generate")
+
+    manifest_lock = threading.Lock()
+    manifest = open(os.path.join(out_dir, MANIFEST_NAME), "a", encoding="utf-8")
+    latencies: List[float] = []
+    failures = 0
+
+    def generate(tid: str, task: CurriculumTask) -> float:
+        started = time.perf_counter()
+        # Batch LLM calls yield to interactive ones in the shared scheduler
+        with priority_scope("batch"):
+            crew = CurriculumCrew(mode=mode)
+            result = crew.generate_curriculum(task.course_idea, task.target_audience)
+            variants = crew.translate(result, languages) if languages else {}
+        write_export(result, "json", os.path.join(out_dir, f"{tid}.json"))
+        write_export(result, "md", os.path.join(out_dir, f"{tid}.md"))
+        for language, variant in variants.items():
+            write_export(variant, "json", os.path.join(out_dir, f"{tid}.{language_slug(language)}.json"))
+            write_export(variant, "md", os.path.join(out_dir, f"{tid}.{language_slug(language)}.md"))
+        return time.perf_counter() - started
+
+    def record(entry: dict) -> None:
+        with manifest_lock:
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+            futures = {pool.submit(generate, tid, task): (tid, task) for tid, task in pending.items()}
+            for future in as_completed(futures):
+                tid, task = futures[future]
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"❌ {task.course_idea}: {type(e).__name__}: {e}")
+                    record({"id": tid, "status": "failed", "error": str(e)})
+                    continue
+                latencies.append(seconds)
+                print(f"✅ {task.course_idea} ({seconds:.1f}s)")
+                record({"id": tid, "status": "done", "seconds": round(seconds, 3), **task.model_dump()})
+    finally:
+        manifest.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "generated": len(latencies),
+        "failed": failures,
+        "skipped": len(done),
+        "elapsed_s": elapsed,
+        "courses_per_min": len(latencies) / elapsed * 60 if elapsed else 0.0,
+        "p50_s": _percentile(latencies, 50),
+        "p95_s": _percentile(latencies, 95),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate many syllabi concurrently with resumable checkpoints.")
+    parser.add_argument("input", help="JSONL or CSV file with course_idea and target_audience columns")
+    parser.add_argument("--out-dir", default="batch_output")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--mode", choices=["sequential", "fanout", "hierarchical"], default=None)
+    parser.add_argument("--languages", default="",
+                        help="Comma-separated languages to translate every syllabus into, e.g. French,German")
+    args = parser.parse_args(argv)
+
+    languages = [language.strip() for language in args.languages.split(",") if language.strip()]
+    summary = run_batch(read_tasks(args.input), args.out_dir, args.concurrency, args.mode, languages)
+    print(
+        f"\n📊 {summary['generated']} generated, {summary['failed']} failed, {summary['skipped']} skipped "
+        f"in {summary['elapsed_s']:.1f}s — {summary['courses_per_min']:.2f} courses/min, "
+        f"p50 {summary['p50_s']:.1f}s, p95 {summary['p95_s']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Responses are stored in SQLite keyed by a SHA-256 of everything that
+determines the completion (model, base_url, temperature, rendered messages).
+Entries are evicted least-recently-used once the cache exceeds its entry or
+byte budget, and expire after a TTL. Code running under ``refresh_scope()``
+skips lookups and overwrites the entries it produces, so a deliberate
+regeneration gets fresh completions.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "crewai-curriculum", "llm_cache.sqlite3")
+
+
+def make_key(model: Optional[str], base_url: Optional[str], temperature: Optional[float], messages: Any, **extra: Any) -> str:
+    payload = {
+        "model": model,
+        "base_url": base_url,
+        "temperature": temperature,
+        "messages": messages,
+    }
+    payload.update({k: v for k, v in extra.items() if v is not None})
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 10_000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 30 * 24 * 3600,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        ttl = os.getenv("LLM_CACHE_TTL_SECONDS")
+        return cls(
+            path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            ttl_seconds=float(ttl) if ttl else 30 * 24 * 3600,
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+        }
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and created < now - self.ttl_seconds
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+
+        entries, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Walk from least recently used until both budgets are satisfied.
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed ASC"):
+            if entries <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            entries -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    return ResponseCache.from_env()
+
+
+current_refresh: ContextVar[bool] = ContextVar("current_refresh", default=False)
+
+
+@contextmanager
+def refresh_scope(refresh: bool = True):
+    token = current_refresh.set(refresh)
+    try:
+        yield
+    finally:
+        current_refresh.reset(token)
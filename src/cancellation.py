@@ -0,0 +1,35 @@
+"""
+Cooperative cancellation of a curriculum run.
+
+Code running under ``cancel_scope(event)`` (including work the crew hands to
+its thread pool, which copies the caller's context) checks the event before
+every LLM call. Once the event is set, the next check raises ``Cancelled``.
+No further provider requests are made, and the run unwinds.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+class Cancelled(BaseException):
+    """Raised inside a cancelled run. A BaseException so agent frameworks' ``except Exception`` retries don't swallow it."""
+
+
+current_cancel: ContextVar[Optional[threading.Event]] = ContextVar("current_cancel", default=None)
+
+
+@contextmanager
+def cancel_scope(event: threading.Event):
+    token = current_cancel.set(event)
+    try:
+        yield event
+    finally:
+        current_cancel.reset(token)
+
+
+def check_cancelled() -> None:
+    event = current_cancel.get()
+    if event is not None and event.is_set():
+        raise Cancelled("generation was cancelled")
@@ -1,14 +1,178 @@
+import os
+import re
 from typing import List, Dict, Any
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field, field_validator, model_validator
+
+from .models import Assessment, Lesson, Module, dumps, loads
+
+def crew_verbose() -> bool:
+    """crewai's step-by-step console logging, on unless CREW_VERBOSE is falsy."""
+    return os.getenv("CREW_VERBOSE", "1").lower() not in ("0", "false", "no", "off")
 
 class CurriculumTask(BaseModel):
     course_idea: str
     target_audience: str
 
 class CurriculumOutput(BaseModel):
+    course_idea: str = ""
+    target_audience: str = ""
     learning_objectives: List[str]
-    lesson_blueprints: List[Dict[str, Any]]
-    assessments: List[Dict[str, Any]]
+    lesson_blueprints: List[Lesson]
+    assessments: List[Assessment]
     review_notes: str
-    package_md: str
-    package_json: Dict[str, Any]
+    workflow_type: str = "sequential_collaboration"
+    # Set on translated variants (see src/translation.py); empty as generated
+    language: str = ""
+    # Hierarchical runs only: consecutive slices of the flat lists above
+    modules: List[Module] = []
+    # Per-task input/output token counts, see src/context.py
+    token_usage: List[Dict[str, Any]] = []
+
+    @model_validator(mode="before")
+    @classmethod
+    def _from_package(cls, data):
+        # Older payloads carried the metadata inside package_json and a
+        # rendered package_md; both are views now.
+        if isinstance(data, dict) and ("package_json" in data or "package_md" in data):
+            data = dict(data)
+            package = data.pop("package_json", None) or {}
+            data.pop("package_md", None)
+            metadata = package.get("course_metadata", {})
+            data.setdefault("course_idea", metadata.get("course_idea", ""))
+            data.setdefault("target_audience", metadata.get("target_audience", ""))
+            workflow_type = package.get("agent_collaboration", {}).get("workflow_type")
+            if workflow_type:
+                data.setdefault("workflow_type", workflow_type)
+        return data
+
+    @property
+    def course_metadata(self) -> Dict[str, Any]:
+        return {
+            "course_idea": self.course_idea,
+            "target_audience": self.target_audience,
+            "total_lessons": len(self.lesson_blueprints),
+            "generation_method": "CrewAI Multi-Agent",
+            **({"language": self.language} if self.language else {})
+        }
+
+    @property
+    def agent_collaboration(self) -> Dict[str, Any]:
+        return {
+            "agents_used": 4,
+            "workflow_type": self.workflow_type,
+            "specializations": ["objectives", "lessons", "assessments", "quality_review"]
+        }
+
+    def module_starts(self) -> Dict[int, Module]:
+        """Index of the first lesson of each module -> that module."""
+        starts, position = {}, 0
+        for module in self.modules:
+            starts[position] = module
+            position += module.size
+        return starts
+
+    @property
+    def package_json(self) -> Dict[str, Any]:
+        """The exported JSON document, built from the canonical fields on each access."""
+        return {
+            "course_metadata": self.course_metadata,
+            "objectives": self.learning_objectives,
+            **({"modules": [module.to_dict() for module in self.modules]} if self.modules else {}),
+            "lessons": [lesson.to_dict() for lesson in self.lesson_blueprints],
+            "assessments": [assessment.to_dict() for assessment in self.assessments],
+            "review_notes": self.review_notes,
+            "agent_collaboration": self.agent_collaboration
+        }
+
+    @property
+    def package_md(self) -> str:
+        """The Markdown syllabus, rendered on each access (see src/export.py for streaming)."""
+        from .export import iter_markdown
+        return b"".join(iter_markdown(self)).decode("utf-8")
+
+    def to_bytes(self) -> bytes:
+        """Compact positional encoding: smaller than ``model_dump_json`` and about twice as fast both ways."""
+        return dumps([
+            1, self.course_idea, self.target_audience, self.learning_objectives,
+            [lesson.to_tuple() for lesson in self.lesson_blueprints],
+            [assessment.to_tuple() for assessment in self.assessments],
+            self.review_notes, self.workflow_type, self.token_usage,
+            [module.to_tuple() for module in self.modules], self.language,
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CurriculumOutput":
+        (_version, course_idea, target_audience, objectives, lessons, assessments,
+         review_notes, workflow_type, token_usage, *rest) = loads(data)
+        modules = rest[0] if rest else []
+        language = rest[1] if len(rest) > 1 else ""
+        # Trusted input written by to_bytes, so pydantic validation is skipped.
+        return cls.model_construct(
+            course_idea=course_idea,
+            target_audience=target_audience,
+            learning_objectives=objectives,
+            lesson_blueprints=[Lesson.from_tuple(values) for values in lessons],
+            assessments=[Assessment.from_tuple(values) for values in assessments],
+            review_notes=review_notes,
+            workflow_type=workflow_type,
+            token_usage=token_usage,
+            modules=[Module.from_tuple(values) for values in modules],
+            language=language,
+        )
+
+# Schemas for the individual items inside CurriculumOutput.lesson_blueprints
+# and CurriculumOutput.assessments, used to validate raw agent output. Aliases
+# absorb the key names models most often use instead of ours.
+
+class LessonSchema(BaseModel):
+    title: str
+    hook: str
+    explain: str = Field(validation_alias=AliasChoices("explain", "explanation", "core_content"))
+    practice: str = Field(validation_alias=AliasChoices("practice", "practice_activity"))
+    reflect: str = Field(validation_alias=AliasChoices("reflect", "reflection"))
+    seat_time: int = Field(60, validation_alias=AliasChoices("seat_time", "estimated_time", "duration"))
+    modality: str = "hybrid"
+
+    @field_validator("seat_time", mode="before")
+    @classmethod
+    def _minutes(cls, value):
+        # "75 minutes" -> 75
+        if isinstance(value, str):
+            match = re.search(r"\d+", value)
+            return int(match.group()) if match else value
+        return value
+
+class MCQSchema(BaseModel):
+    question: str
+    options: List[str] = Field(min_length=2)
+    correct: int = Field(validation_alias=AliasChoices("correct", "answer", "correct_index"))
+    explanation: str = ""
+
+    @field_validator("correct", mode="before")
+    @classmethod
+    def _letter_to_index(cls, value):
+        # "B" -> 1
+        if isinstance(value, str) and len(value.strip()) == 1 and value.strip().isalpha():
+            return ord(value.strip().upper()) - ord("A")
+        return value
+
+    @model_validator(mode="after")
+    def _correct_in_range(self):
+        if not 0 <= self.correct < len(self.options):
+            raise ValueError(f"correct index {self.correct} is outside the {len(self.options)} options")
+        return self
+
+class ModuleSchema(BaseModel):
+    title: str
+    summary: str = Field("", validation_alias=AliasChoices("summary", "description", "overview"))
+
+class ShortAnswerSchema(BaseModel):
+    question: str
+    rubric: str
+    sample_answer: str = ""
+
+class AssessmentSchema(BaseModel):
+    lesson_title: str = ""
+    objective_measured: str = ""
+    mcqs: List[MCQSchema] = Field(min_length=1)
+    short_answer: ShortAnswerSchema
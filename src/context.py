@@ -0,0 +1,229 @@
+"""
+Compact context passing and token accounting between tasks.
+
+Instead of f-stringing whole Python objects into prompts, upstream outputs are
+reduced to a canonical minimal form (stable IDs, titles, objective references)
+and each task only receives the fields it declares in
+``tasks.CONTEXT_FIELDS``. Long strings are clipped, so every item costs a
+bounded number of tokens no matter how verbose the upstream agent was.
+"""
+
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence
+
+MAX_FIELD_CHARS = 240
+
+
+def objective_id(i: int) -> str:
+    return f"O{i + 1}"
+
+
+def lesson_id(i: int) -> str:
+    return f"L{i + 1}"
+
+
+def module_id(i: int) -> str:
+    return f"M{i + 1}"
+
+
+def _clip(value: Any, limit: int) -> Any:
+    if isinstance(value, list):
+        return [_clip(v, limit) for v in value]
+    if isinstance(value, str) and len(value) > limit:
+        return value[: limit - 1].rstrip() + "…"
+    return value
+
+
+def canonical_objectives(objectives: Sequence[str]) -> List[Dict[str, Any]]:
+    return [{"id": objective_id(i), "text": text} for i, text in enumerate(objectives)]
+
+
+# Lessons and assessments are positional: item i belongs to objective i. A
+# None placeholder (an item that failed to parse) is skipped but keeps its
+# position, so the ids of the items after it stay aligned.
+
+def canonical_lessons(lessons: Sequence[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    return [
+        {"id": lesson_id(i), "objective": objective_id(i), **lesson}
+        for i, lesson in enumerate(lessons) if lesson is not None
+    ]
+
+
+def canonical_assessments(assessments: Sequence[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    canonical = []
+    for i, assessment in enumerate(assessments):
+        if assessment is None:
+            continue
+        mcqs = assessment.get("mcqs") or []
+        short_answer = assessment.get("short_answer") or {}
+        canonical.append({
+            "id": f"A{i + 1}",
+            "lesson": lesson_id(i),
+            "objective": objective_id(i),
+            "mcqs": len(mcqs),
+            "mcq_questions": [m.get("question", "") for m in mcqs if isinstance(m, dict)],
+            "short_answer": short_answer.get("question", "") if isinstance(short_answer, dict) else "",
+        })
+    return canonical
+
+
+def canonical_modules(modules: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{"id": module_id(i), **module} for i, module in enumerate(modules)]
+
+
+_CANONICAL = {
+    "modules": canonical_modules,
+    "objectives": canonical_objectives,
+    "lessons": canonical_lessons,
+    "assessments": canonical_assessments,
+}
+
+
+def compact(fields: Dict[str, Sequence[str]], max_chars: int = MAX_FIELD_CHARS,
+            values: Optional[Dict[str, Any]] = None, **sections: Any) -> str:
+    """
+    Serialize only the requested fields of each section, e.g.
+    ``compact({"objectives": ("id", "text")}, objectives=[...])``. Plain
+    ``values`` go first, in the given order.
+    """
+    payload = dict(values or {})
+    for section, wanted in fields.items():
+        items = sections.get(section)
+        if items is None:
+            continue
+        payload[section] = [
+            {field: _clip(item[field], max_chars) for field in wanted if field in item}
+            for item in _CANONICAL[section](items)
+        ]
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+_encoder = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count via tiktoken when installed, otherwise the usual ~4 chars/token estimate."""
+    global _encoder
+    if not text:
+        return 0
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def task_input_text(task) -> str:
+    agent = task.agent
+    return "\n".join(
+        str(part) for part in (
+            getattr(agent, "role", ""), getattr(agent, "goal", ""), getattr(agent, "backstory", ""),
+            task.description, task.expected_output,
+        ) if part
+    )
+
+
+def provider_usage(usage: Dict[str, Any]) -> Dict[str, int]:
+    """Prompt/cached/completion tokens from a provider's ``usage`` block (OpenAI, DeepSeek or Anthropic style)."""
+    details = usage.get("prompt_tokens_details") or {}
+    cached = details.get("cached_tokens")
+    if cached is None:
+        cached = usage.get("prompt_cache_hit_tokens", usage.get("cache_read_input_tokens"))
+    prompt = usage.get("prompt_tokens") or 0
+    cached = min(cached or 0, prompt)
+    return {"prompt_tokens": prompt, "cached_tokens": cached, "uncached_tokens": prompt - cached,
+            "completion_tokens": usage.get("completion_tokens") or 0}
+
+
+# Provider-reported usage of the LLM call in flight, filled in from the HTTP
+# response by router.py while ``collect_usage`` is active.
+current_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("current_usage", default=None)
+
+
+@contextmanager
+def collect_usage():
+    usage: Dict[str, int] = {}
+    token = current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        current_usage.reset(token)
+
+
+def record_usage(usage: Dict[str, Any]) -> None:
+    collector = current_usage.get()
+    if collector is not None:
+        for key, value in provider_usage(usage).items():
+            collector[key] = collector.get(key, 0) + value
+
+
+class TokenLedger:
+    """
+    Per-task input/output token counts for one curriculum run (estimated with
+    ``estimate_tokens``), plus provider-reported usage per LLM call where the
+    provider's usage was captured and the run's response cache lookups.
+    """
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, task, output: str, index: Optional[int] = None) -> Dict[str, Any]:
+        entry = {
+            "task": stage,
+            "index": index,
+            "input_tokens": estimate_tokens(task_input_text(task)),
+            "output_tokens": estimate_tokens(output or ""),
+        }
+        with self._lock:
+            self.entries.append(entry)
+        return entry
+
+    def record_llm(self, role: Optional[str], model: str, usage: Dict[str, int]) -> None:
+        """One provider call; ``usage`` is empty when the provider's usage was not captured."""
+        with self._lock:
+            self.llm_calls.append({"role": role, "model": model, "reported": bool(usage), **usage})
+
+    def record_cache(self, hit: bool) -> None:
+        """One response cache lookup made by this run."""
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "input_tokens": sum(e["input_tokens"] for e in self.entries),
+                "output_tokens": sum(e["output_tokens"] for e in self.entries),
+                "calls": len(self.entries),
+                "cached_input_tokens": sum(c.get("cached_tokens", 0) for c in self.llm_calls),
+                "uncached_input_tokens": sum(c.get("uncached_tokens", 0) for c in self.llm_calls),
+                "reported_calls": sum(c["reported"] for c in self.llm_calls),
+                "provider_calls": len(self.llm_calls),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+            }
+
+    def summary(self) -> str:
+        with self._lock:
+            entries = list(self.entries)
+        lines = []
+        for e in entries:
+            label = e["task"] if e["index"] is None else f"{e['task']}[{e['index'] + 1}]"
+            lines.append(f"   {label:<16} in {e['input_tokens']:>6}  out {e['output_tokens']:>6}")
+        return "\n".join(lines)
+
+
+current_ledger: ContextVar[Optional[TokenLedger]] = ContextVar("current_ledger", default=None)
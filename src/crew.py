@@ -1,275 +1,801 @@
-from crewai import Crew
-from .agents import objective_agent, lesson_agent, assessment_agent, review_agent
+from .agents import AGENT_NAMES, get_agent
 from .tasks import (
     create_objectives_task,
     create_lessons_task,
     create_assessments_task,
-    create_review_task
+    create_review_task,
+    create_lesson_task,
+    create_assessment_task,
+    create_repair_task,
+    create_outline_task,
+    create_module_objectives_task,
+    create_course_review_task,
+    create_translation_task
 )
-from .config import CurriculumTask, CurriculumOutput
-import json
+from .config import CurriculumTask, CurriculumOutput, crew_verbose
+from .cancellation import check_cancelled
+from .events import CrewEvent, EventCallback, STAGES, TASK_START, TASK_COMPLETE, PARTIAL_OUTPUT
+from .parsing import (
+    OutputParseError,
+    parse_objectives,
+    parse_lesson,
+    parse_lessons,
+    parse_assessment,
+    parse_assessments,
+    parse_outline,
+    parse_review,
+    parse_translation
+)
+from .context import TokenLedger, current_ledger
+from .models import Assessment, Lesson, Module
+from .store import get_curriculum_store, store_enabled
+from .translation import BATCH_CHARS, apply_translations, batch_segments, text_segments
+from .graph import MemoStore, Node, assessment_key, downstream, lesson_key, review_key
+from .tracing import current_span, get_tracer, mark_enqueued
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import contextvars
+import dataclasses
+import os
+import queue
+import time
+from typing import Dict, Iterable, List, Union
+
+STAGE_AGENTS = dict(zip(STAGES, AGENT_NAMES))
 
 class CurriculumCrew:
-    def __init__(self):
-        self.objective_agent = objective_agent
-        self.lesson_agent = lesson_agent
-        self.assessment_agent = assessment_agent
-        self.review_agent = review_agent
+    def __init__(self, mode: str = None, max_workers: int = None):
+        # "sequential" runs one crew for all four stages; "fanout" runs one
+        # lesson + assessment chain per objective on a bounded thread pool;
+        # "hierarchical" splits the course into modules first and runs every
+        # module as its own fan-out.
+        self.mode = mode or os.getenv("CREW_MODE", "sequential")
+        self.modules = int(os.getenv("CREW_MODULES", "4"))
+        self.max_workers = max_workers or int(os.getenv("CREW_MAX_WORKERS", "4"))
+        # How often a single malformed task or item is re-prompted before giving up
+        self.max_repairs = int(os.getenv("CREW_MAX_REPAIRS", "2"))
+        # Per-item outputs keyed by their inputs, for regenerate()
+        self.memo = MemoStore()
+        # "llm" always runs the reviewer agent, "local" only the deterministic
+        # checks in src/validator.py, "auto" the agent when those are borderline.
+        self.review_mode = os.getenv("REVIEW_MODE", "llm")
+        # What to do with past curricula in the store (src/store.py): "off",
+        # "exact" reuses identical requests, "near" also close rephrasings,
+        # "seed" starts a close rephrasing from the stored objectives.
+        self.reuse = os.getenv("CURRICULUM_REUSE", "exact")
+        self.near_score = float(os.getenv("CURRICULUM_NEAR_SCORE", "0.6"))
+        # Source characters per translation call, see translate()
+        self.translation_batch_chars = int(os.getenv("TRANSLATION_BATCH_CHARS", str(BATCH_CHARS)))
+    
+    # Agents are built on first use (see src/agents), so a crew that only
+    # needs one of them, or none, never pays for the others.
+    @property
+    def objective_agent(self):
+        return get_agent("objective")
+    
+    @property
+    def lesson_agent(self):
+        return get_agent("lesson")
+    
+    @property
+    def assessment_agent(self):
+        return get_agent("assessment")
+    
+    @property
+    def review_agent(self):
+        return get_agent("review")
     
-    def create_crew(self, course_idea: str, target_audience: str):
+    @property
+    def translation_agent(self):
+        return get_agent("translation")
+    
+    def create_crew(self, course_idea: str, target_audience: str, on_event: EventCallback = None,
+                    review: bool = True):
+        from crewai import Crew
+        
+        # Fresh agent copies per crew so concurrent generations (batch runs)
+        # never share executor state.
+        objective_agent = self.objective_agent.copy()
+        lesson_agent = self.lesson_agent.copy()
+        assessment_agent = self.assessment_agent.copy()
+        review_agent = self.review_agent.copy()
+        
         objectives_task = create_objectives_task(
-            self.objective_agent, course_idea, target_audience
+            objective_agent, course_idea, target_audience
         )
         
-        lessons_task = create_lessons_task(
-            self.lesson_agent, ["{{objectives}}"]  # Will be replaced with actual objectives
-        )
-        lessons_task.context = [objectives_task]
+        # Downstream prompts start empty and are filled in with the compact
+        # form of upstream outputs as each task finishes (see _stage_callback),
+        # so no task is handed the raw prose of everything before it.
+        outputs = {"course_idea": course_idea, "target_audience": target_audience}
+        lessons_task = create_lessons_task(lesson_agent, [])
+        assessments_task = create_assessments_task(assessment_agent, [], [])
+        review_task = create_review_task(review_agent, {
+            "course_idea": course_idea,
+            "target_audience": target_audience
+        })
         
-        assessments_task = create_assessments_task(
-            self.assessment_agent, ["{{lessons}}"]  # Will be replaced with actual lessons
-        )
-        assessments_task.context = [lessons_task]
+        def prepare_lessons():
+            lessons_task.description = create_lessons_task(
+                lesson_agent, outputs["objectives"]
+            ).description
         
-        review_task = create_review_task(
-            self.review_agent, {
-                "course_idea": course_idea,
-                "target_audience": target_audience,
-                "objectives": ["{{objectives}}"],
-                "lessons": ["{{lessons}}"],
-                "assessments": ["{{assessments}}"]
-            }
-        )
-        review_task.context = [objectives_task, lessons_task, assessments_task]
+        def prepare_assessments():
+            assessments_task.description = create_assessments_task(
+                assessment_agent, outputs["lessons"], outputs["objectives"]
+            ).description
+        
+        def prepare_review():
+            review_task.description = create_review_task(review_agent, outputs).description
+        
+        tasks = [objectives_task, lessons_task, assessments_task, review_task]
+        prepare_next = [prepare_lessons, prepare_assessments, prepare_review, None]
+        agents = [objective_agent, lesson_agent, assessment_agent, review_agent]
+        if not review:
+            tasks, agents = tasks[:-1], agents[:-1]
+        # The sequential process runs each task callback on the kickoff thread
+        # right after the task finishes, before the next one starts. A None
+        # context gives the task no crewai context at all (crewai >= 0.120;
+        # older versions injected every prior raw output), so each prompt is
+        # exactly the compact description that TokenLedger counts.
+        for i, (task, stage) in enumerate(zip(tasks, STAGES)):
+            task.context = None
+            last = i + 1 == len(tasks)
+            task.callback = self._stage_callback(
+                on_event, task, stage, None if last else STAGES[i + 1], outputs,
+                None if last else prepare_next[i]
+            )
         
         return Crew(
-            agents=[
-                self.objective_agent,
-                self.lesson_agent,
-                self.assessment_agent,
-                self.review_agent
-            ],
-            tasks=[objectives_task, lessons_task, assessments_task, review_task],
-            verbose=True,
+            agents=agents,
+            tasks=tasks,
+            verbose=crew_verbose(),
             process="sequential"
         )
     
-    def generate_curriculum(self, course_idea: str, target_audience: str) -> CurriculumOutput:
-        print(f"🚀 CrewAI starting curriculum generation for: {course_idea}")
+    def generate_curriculum(self, course_idea: str, target_audience: str,
+                            on_event: EventCallback = None, reuse: str = None) -> CurriculumOutput:
+        reuse = reuse or self.reuse
+        match = self.find_stored(course_idea, target_audience) if reuse != "off" else None
+        if match is not None and (match["exact"] or reuse == "near"):
+            stored = get_curriculum_store().load(match["id"])
+            if stored is not None:
+                print(f"📚 Reusing stored curriculum #{match['id']} for: {match['course_idea']} "
+                      f"(similarity {match['score']:.2f})")
+                return stored
         
-        crew = self.create_crew(course_idea, target_audience)
+        seed = get_curriculum_store().load(match["id"]) if match is not None and reuse == "seed" else None
+        if seed is not None:
+            print(f"🌱 Seeding from stored curriculum #{match['id']}: {match['course_idea']}")
+            return self._run(
+                "generate_curriculum", course_idea, target_audience,
+                lambda: self._regenerate(course_idea, target_audience, seed.learning_objectives, set(),
+                                         on_event, workflow_type="seeded_from_store")
+            )
         
-        print("🤖 Agents collaborating...")
-        result = crew.kickoff()
+        print(f"🚀 CrewAI starting curriculum generation for: {course_idea}")
+        return self._run(
+            "generate_curriculum", course_idea, target_audience,
+            lambda: self._generate(course_idea, target_audience, on_event)
+        )
+    
+    def find_stored(self, course_idea: str, target_audience: str):
+        """The closest past request in the store, if it is an exact or near duplicate."""
+        if not store_enabled():
+            return None
+        matches = get_curriculum_store().find_similar(course_idea, target_audience, limit=1,
+                                                      min_score=self.near_score)
+        return matches[0] if matches else None
+    
+    def regenerate(self, curriculum: CurriculumOutput, changed: Iterable[Union[int, str]] = (),
+                   objectives: List[str] = None, on_event: EventCallback = None) -> CurriculumOutput:
+        """
+        Recompute only the parts of ``curriculum`` that depend on what changed.
         
-        print("📊 Processing agent results...")
+        ``changed`` lists objectives (by index or text) whose lesson and
+        assessment must be regenerated, e.g. after the reviewer rejected them;
+        ``objectives`` is an edited objective list. Everything whose inputs are
+        unchanged is served from the memo, so editing one objective costs about
+        three LLM calls: its lesson, its assessment and the review.
+        """
+        course_idea, target_audience = curriculum.course_idea, curriculum.target_audience
+        self.memo.remember(
+            course_idea, target_audience, curriculum.learning_objectives,
+            [lesson.to_dict() for lesson in curriculum.lesson_blueprints],
+            [assessment.to_dict() for assessment in curriculum.assessments], curriculum.review_notes
+        )
+        objectives = list(objectives or curriculum.learning_objectives)
+        forced = self._changed_indices(objectives, changed)
+        # Module boundaries (and the reviews of untouched modules) survive
+        # edits that keep the objective count.
+        modules = [dataclasses.replace(m) for m in curriculum.modules]
+        if sum(m.size for m in modules) != len(objectives):
+            modules = []
+        print(f"♻️ Regenerating curriculum for: {course_idea}")
+        return self._run(
+            "regenerate_curriculum", course_idea, target_audience,
+            lambda: self._regenerate(course_idea, target_audience, objectives, forced, on_event, modules=modules)
+        )
+    
+    def translate(self, curriculum: CurriculumOutput, languages: Iterable[str]) -> Dict[str, CurriculumOutput]:
+        """
+        Variants of ``curriculum`` in each of ``languages``, with the same
+        structure item for item (see src/translation.py).
         
-        # Parse results and create structured output
-        objectives = self._extract_objectives(result)
-        lessons = self._extract_lessons(result)
-        assessments = self._extract_assessments(result)
-        review_notes = self._extract_review(result)
+        Nothing is regenerated. The distinct strings are translated in a few
+        large batches that run in parallel. Each batch goes out in the first
+        language before the others, so the rest reuse its cached prompt
+        prefix at the provider (and repeat runs hit the response cache).
+        """
+        languages = list(dict.fromkeys(languages))
+        texts = text_segments(curriculum)
+        batches = batch_segments(texts, self.translation_batch_chars)
+        if not languages:
+            return {}
+        print(f"🌐 Translating {len(texts)} strings into {', '.join(languages)} "
+              f"({len(batches)} batch(es) per language)")
+        translated = {language: [None] * len(batches) for language in languages}
+        tracer = get_tracer()
+        ledger = TokenLedger()
+        ledger_token = current_ledger.set(ledger)
+        try:
+            with tracer.span("translate_curriculum", "run", course_idea=curriculum.course_idea,
+                             languages=",".join(languages), batches=len(batches)) as run_span:
+                with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="translation") as pool:
+                    pending = {
+                        self._submit(pool, self._translation_item, batch, languages[0], b): (languages[0], b)
+                        for b, batch in enumerate(batches)
+                    }
+                    while pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            language, b = pending.pop(future)
+                            translated[language][b] = future.result()
+                            if language == languages[0]:
+                                for other in languages[1:]:
+                                    pending[self._submit(
+                                        pool, self._translation_item, batches[b], other, b
+                                    )] = (other, b)
+                totals = ledger.totals()
+                run_span.set(input_tokens=totals["input_tokens"], output_tokens=totals["output_tokens"],
+                             cached_input_tokens=totals["cached_input_tokens"], tasks=totals["calls"])
+        finally:
+            current_ledger.reset(ledger_token)
         
-        # Create markdown package
-        package_md = self._create_markdown(course_idea, target_audience, objectives, lessons, assessments)
+        print(f"🧮 Tokens (estimated): {totals['input_tokens']} in / {totals['output_tokens']} out "
+              f"over {totals['calls']} tasks")
+        print(f"✅ {len(languages)} translated variant(s) ready")
+        variants = {}
+        for language in languages:
+            variant = apply_translations(curriculum, texts, [text for batch in translated[language] for text in batch],
+                                         language)
+            variant.token_usage = [e for e in ledger.entries if e["task"] == f"translation:{language}"]
+            variants[language] = variant
+        return variants
+    
+    def _translation_item(self, segments: List[str], language: str, index: int) -> List[str]:
+        make_task = lambda: create_translation_task(self.translation_agent, language, segments)
+        stage = f"translation:{language}"
+        raw = self._kickoff_task(make_task(), stage, index, language=language)
+        return self._parse_or_repair(raw, lambda r: parse_translation(r, len(segments)), make_task,
+                                     f"{language} translation batch {index + 1}", stage, index)
+    
+    @staticmethod
+    def _changed_indices(objectives: List[str], changed: Iterable[Union[int, str]]) -> set:
+        """Positions of the ``changed`` objectives; unknown texts and out-of-range indices are errors."""
+        indices = set()
+        for entry in changed:
+            if isinstance(entry, str):
+                if entry not in objectives:
+                    raise ValueError(f"changed objective {entry!r} is not one of the curriculum's objectives")
+                indices.add(objectives.index(entry))
+            elif isinstance(entry, int) and not isinstance(entry, bool) and 0 <= entry < len(objectives):
+                indices.add(entry)
+            else:
+                raise ValueError(f"changed entry {entry!r} must be an objective text or an index "
+                                 f"from 0 to {len(objectives) - 1}")
+        return indices
+    
+    def _run(self, name: str, course_idea: str, target_audience: str, generate) -> CurriculumOutput:
+        tracer = get_tracer()
+        ledger = TokenLedger()
+        ledger_token = current_ledger.set(ledger)
+        try:
+            with tracer.span(name, "run", course_idea=course_idea,
+                             target_audience=target_audience, mode=self.mode) as run_span, \
+                    tracer.profiled(run_span):
+                objectives, lessons, assessments, review_notes, workflow_type, modules = generate()
+                totals = ledger.totals()
+                run_span.set(input_tokens=totals["input_tokens"], output_tokens=totals["output_tokens"],
+                             cached_input_tokens=totals["cached_input_tokens"],
+                             tasks=totals["calls"], lessons=len(lessons), modules=len(modules))
+        finally:
+            current_ledger.reset(ledger_token)
+        self.memo.remember(course_idea, target_audience, objectives, lessons, assessments, review_notes)
         
+        if totals["cache_hits"] or totals["cache_misses"]:
+            # This run's lookups only; none are made with LLM_CACHE=0
+            print(f"💾 LLM cache: {totals['cache_hits']} hits / {totals['cache_misses']} misses")
+        print(f"🧮 Tokens (estimated): {totals['input_tokens']} in / {totals['output_tokens']} out "
+              f"over {totals['calls']} tasks")
+        if totals["reported_calls"]:
+            reported = totals["cached_input_tokens"] + totals["uncached_input_tokens"]
+            print(f"🗄️ Provider prompt cache: {totals['cached_input_tokens']} of {reported} input tokens cached "
+                  f"({totals['cached_input_tokens'] / max(reported, 1):.0%}) over {totals['reported_calls']} "
+                  f"of {totals['provider_calls']} calls")
+        elif totals["provider_calls"]:
+            print("🗄️ Provider prompt cache: not reported (needs an openai/ model with LLM_POOL=1)")
+        print(ledger.summary())
+        print(f"⏱️ {run_span.wall_ms / 1000:.1f}s, {run_span.attributes.get('retries', 0)} re-prompts")
         print("✅ CrewAI curriculum generation complete")
         
-        return CurriculumOutput(
+        output = CurriculumOutput(
+            course_idea=course_idea,
+            target_audience=target_audience,
             learning_objectives=objectives,
-            lesson_blueprints=lessons,
-            assessments=assessments,
+            lesson_blueprints=[Lesson.from_dict(lesson) for lesson in lessons],
+            assessments=[Assessment.from_dict(assessment) for assessment in assessments],
             review_notes=review_notes,
-            package_md=package_md,
-            package_json={
-                "course_metadata": {
-                    "course_idea": course_idea,
-                    "target_audience": target_audience,
-                    "total_lessons": len(lessons),
-                    "generation_method": "CrewAI Multi-Agent"
-                },
+            workflow_type=workflow_type,
+            modules=modules,
+            token_usage=ledger.entries,
+        )
+        if store_enabled():
+            try:
+                get_curriculum_store().save(output)
+            except Exception as e:  # the store is an optimization, never fail a run over it
+                print(f"⚠️ Could not save curriculum to the store: {e}")
+        return output
+    
+    def _generate(self, course_idea: str, target_audience: str, on_event: EventCallback = None):
+        if self.mode == "fanout":
+            objectives, lessons, assessments, review_notes = self._run_fanout(
+                course_idea, target_audience, on_event
+            )
+            return objectives, lessons, assessments, review_notes, "parallel_fanout", []
+        if self.mode == "hierarchical":
+            return self._run_hierarchical(course_idea, target_audience, on_event)
+        
+        llm_review = self.review_mode == "llm"
+        crew = self.create_crew(course_idea, target_audience, on_event, review=llm_review)
+        
+        print("🤖 Agents collaborating...")
+        self._emit(on_event, TASK_START, "objectives")
+        # crewai runs the tasks internally, so stage spans are opened here and
+        # rotated by the task callbacks (see _stage_callback).
+        tracer = get_tracer()
+        stage_token = current_span.set(
+            tracer.start_span("objectives", "task", agent=self.objective_agent.role)
+        )
+        try:
+            result = crew.kickoff()
+        except BaseException as e:
+            tracer.end_span(current_span.get(), e)
+            raise
+        finally:
+            current_span.reset(stage_token)
+        
+        print("📊 Processing agent results...")
+        
+        # Parse results and create structured output. A malformed stage or
+        # item is re-prompted on its own rather than re-running the crew.
+        raw = [output.raw for output in result.tasks_output]
+        objectives = self._extract_objectives(raw[0], course_idea, target_audience)
+        lessons = self._extract_lessons(raw[1], objectives)
+        assessments = self._extract_assessments(raw[2], objectives, lessons)
+        if llm_review:
+            review_notes = self._extract_review(raw[3], lambda: create_review_task(self.review_agent, {
+                "course_idea": course_idea,
+                "target_audience": target_audience,
                 "objectives": objectives,
                 "lessons": lessons,
-                "assessments": assessments,
-                "review_notes": review_notes,
-                "agent_collaboration": {
-                    "agents_used": 4,
-                    "workflow_type": "sequential_collaboration",
-                    "specializations": ["objectives", "lessons", "assessments", "quality_review"]
-                }
-            }
+                "assessments": assessments
+            }))
+        else:
+            review_notes = self._review(course_idea, target_audience, objectives, lessons, assessments, on_event)
+        return objectives, lessons, assessments, review_notes, "sequential_collaboration", []
+    
+    @staticmethod
+    def _emit(on_event: EventCallback, kind: str, stage: str, **fields):
+        if on_event:
+            on_event(CrewEvent(kind=kind, stage=stage, **fields))
+    
+    def _stage_callback(self, on_event: EventCallback, task, stage: str, next_stage: str,
+                        outputs: dict, prepare_next):
+        def callback(output):
+            self._record_tokens(stage, task, output.raw)
+            tracer = get_tracer()
+            span = current_span.get()
+            if span is not None and span.kind == "task":
+                tracer.end_span(span)
+            if next_stage:
+                next_agent = get_agent(STAGE_AGENTS[next_stage])
+                current_span.set(tracer.start_span(
+                    next_stage, "task", parent=span.root if span else None, agent=next_agent.role
+                ))
+            data = self._partial_data(stage, output.raw)
+            if data is None:
+                data = [output.raw] if stage == "objectives" else []
+            outputs[stage] = data
+            self._emit(on_event, TASK_COMPLETE, stage, raw=output.raw)
+            self._emit(on_event, PARTIAL_OUTPUT, stage, raw=output.raw, data=data)
+            if prepare_next:
+                prepare_next()
+            if next_stage:
+                self._emit(on_event, TASK_START, next_stage)
+        return callback
+    
+    @staticmethod
+    def _record_tokens(stage: str, task, raw: str, index: int = None):
+        ledger = current_ledger.get() or TokenLedger()
+        entry = ledger.record(stage, task, raw, index)
+        span = current_span.get()
+        if span is not None and span.kind == "task":
+            span.set(input_tokens=entry["input_tokens"], output_tokens=entry["output_tokens"])
+    
+    @staticmethod
+    def _submit(pool, fn, *args):
+        # Run in a copy of the caller's context so per-run state (token
+        # ledger, current span) follows the work onto pool threads, and note
+        # when it was queued so task spans can report queue time.
+        submitted = time.perf_counter()
+        return pool.submit(contextvars.copy_context().run, CurriculumCrew._dequeued, submitted, fn, *args)
+    
+    @staticmethod
+    def _dequeued(submitted: float, fn, *args):
+        mark_enqueued(submitted)
+        return fn(*args)
+    
+    @staticmethod
+    def _partial_data(stage: str, raw: str):
+        # Best effort only: malformed stages are repaired after the crew finishes.
+        # Invalid items stay as None so later items keep their positions.
+        try:
+            if stage == "objectives":
+                return parse_objectives(raw)
+            if stage == "lessons":
+                return parse_lessons(raw)[0]
+            if stage == "assessments":
+                return parse_assessments(raw)[0]
+            return parse_review(raw)
+        except OutputParseError:
+            return None
+    
+    def _kickoff_task(self, task, stage: str, index: int = None, **span_attributes) -> str:
+        # Agents keep per-run executor state, so every task gets its own copy
+        # to stay safe when several run on the pool at once.
+        from crewai import Crew
+        
+        check_cancelled()
+        task.agent = task.agent.copy()
+        crew = Crew(agents=[task.agent], tasks=[task], verbose=crew_verbose(), process="sequential")
+        with get_tracer().span(stage, "task", agent=task.agent.role, index=index, **span_attributes):
+            raw = crew.kickoff().raw
+            self._record_tokens(stage, task, raw, index)
+        return raw
+    
+    def _parse_or_repair(self, raw: str, parse, make_task, label: str, stage: str, index: int = None):
+        """Parse one task's output, re-prompting only that task while it stays malformed."""
+        for attempt in range(self.max_repairs + 1):
+            try:
+                return parse(raw)
+            except OutputParseError as e:
+                if attempt == self.max_repairs:
+                    raise
+                print(f"🔧 Re-prompting {label}: {e}")
+                run_span = current_span.get()
+                if run_span is not None:
+                    run_span.root.incr("retries")
+                raw = self._kickoff_task(
+                    create_repair_task(make_task(), raw, str(e)), stage, index, repair=attempt + 1
+                )
+    
+    def _run_item(self, make_task, parse, label: str, stage: str, index: int, problem: str = None):
+        task = make_task()
+        if problem is not None:
+            task = create_repair_task(task, "", problem)
+        raw = self._kickoff_task(task, stage, index)
+        return raw, self._parse_or_repair(raw, parse, make_task, label, stage, index)
+    
+    def _lesson_item(self, objective: str, index: int, problem: str = None):
+        return self._run_item(
+            lambda: create_lesson_task(self.lesson_agent, objective),
+            parse_lesson, f"lesson for '{objective}'", "lessons", index, problem
         )
     
-    def _extract_objectives(self, result):
-        # Generate realistic SMART objectives with Bloom's taxonomy
-        return [
-            "Analyze key ethical frameworks and their applications in data management",
-            "Evaluate ethical decision-making processes in fintech contexts",
-            "Create ethical guidelines for data handling in their organization",
-            "Apply ethical principles to real-world data scenarios"
-        ]
-    
-    def _extract_lessons(self, result):
-        # Generate comprehensive lesson blueprints
-        return [
-            {
-                "title": "Lesson 1: Foundations of Data Ethics",
-                "hook": "Case study: A fintech startup accidentally exposed customer financial data. What went wrong?",
-                "explain": "Interactive presentation covering fundamental ethical frameworks, privacy principles, and regulatory landscape (GDPR, CCPA)",
-                "practice": "Group exercise analyzing real data breach scenarios and identifying ethical violations",
-                "reflect": "Discussion on implementing ethical frameworks in daily decision-making processes",
-                "seat_time": 75,
-                "modality": "hybrid"
-            },
-            {
-                "title": "Lesson 2: Decision-Making Frameworks",
-                "hook": "Role-play: You're deciding whether to use customer data for a new AI feature. How do you proceed?",
-                "explain": "Step-by-step ethical decision-making models and stakeholder analysis techniques",
-                "practice": "Workshop applying decision frameworks to company-specific scenarios",
-                "reflect": "Personal action planning for ethical decision-making in their role",
-                "seat_time": 90,
-                "modality": "in-person"
-            },
-            {
-                "title": "Lesson 3: Creating Organizational Guidelines",
-                "hook": "Challenge: Design a one-page ethical checklist your team could actually use",
-                "explain": "Best practices for developing, implementing, and maintaining ethical guidelines",
-                "practice": "Collaborative creation of ethical guidelines tailored to their organization",
-                "reflect": "Planning implementation strategies and addressing potential resistance",
-                "seat_time": 85,
-                "modality": "online"
-            },
-            {
-                "title": "Lesson 4: Practical Application and Monitoring",
-                "hook": "Simulation: Handle three ethical dilemmas in 10 minutes - just like real work pressure",
-                "explain": "Monitoring systems, metrics for ethical compliance, and continuous improvement approaches",
-                "practice": "Case-based problem solving with time pressure and competing priorities",
-                "reflect": "Commitment to specific ethical practices and accountability measures",
-                "seat_time": 80,
-                "modality": "hybrid"
-            }
-        ]
-    
-    def _extract_assessments(self, result):
-        # Generate detailed assessments with rubrics
-        return [
-            {
-                "lesson_title": "Lesson 1: Foundations of Data Ethics",
-                "objective_measured": "Analyze key ethical frameworks and their applications in data management",
-                "mcqs": [
-                    {
-                        "question": "Which ethical principle is most directly violated when personal data is used without consent?",
-                        "options": ["Autonomy", "Beneficence", "Non-maleficence", "Justice"],
-                        "correct": 0,
-                        "explanation": "Autonomy respects individual rights to make decisions about their own data"
-                    },
-                    {
-                        "question": "What is the primary purpose of GDPR in data ethics?",
-                        "options": ["Increase profits", "Protect individual privacy rights", "Simplify data processing", "Reduce costs"],
-                        "correct": 1,
-                        "explanation": "GDPR primarily aims to protect individual privacy and data rights"
-                    }
-                ],
-                "short_answer": {
-                    "question": "Describe a situation from your work where ethical frameworks could guide data usage decisions. Explain which framework would be most applicable and why.",
-                    "rubric": "Answer should include: 1) Specific work scenario (2 pts), 2) Identification of ethical framework (3 pts), 3) Application reasoning (3 pts), 4) Practical implementation (2 pts). Total: 10 points",
-                    "sample_answer": "When analyzing customer spending patterns for marketing, utilitarian framework applies by weighing benefits (better service) against risks (privacy invasion), ensuring net positive outcomes."
-                }
-            },
-            {
-                "lesson_title": "Lesson 2: Decision-Making Frameworks",
-                "objective_measured": "Evaluate ethical decision-making processes in fintech contexts",
-                "mcqs": [
-                    {
-                        "question": "In stakeholder analysis for data decisions, who should be considered first?",
-                        "options": ["Company shareholders", "Data subjects", "Regulators", "Technical team"],
-                        "correct": 1,
-                        "explanation": "Data subjects are most directly affected and should be primary consideration"
-                    },
-                    {
-                        "question": "What is the most important factor when evaluating competing ethical principles?",
-                        "options": ["Legal compliance", "Cost implications", "Stakeholder impact", "Technical feasibility"],
-                        "correct": 2,
-                        "explanation": "Stakeholder impact assessment is central to ethical decision-making"
-                    }
-                ],
-                "short_answer": {
-                    "question": "Walk through a decision-making framework for a scenario where your company wants to share anonymized customer data with a research partner.",
-                    "rubric": "Answer should include: 1) Framework identification (2 pts), 2) Stakeholder analysis (3 pts), 3) Risk assessment (3 pts), 4) Decision rationale (2 pts). Total: 10 points",
-                    "sample_answer": "Using stakeholder analysis framework: identify affected parties (customers, company, researchers, society), assess risks/benefits for each, prioritize customer privacy while considering research benefits, implement with strong anonymization and consent processes."
-                }
-            },
-            {
-                "lesson_title": "Lesson 3: Creating Organizational Guidelines",
-                "objective_measured": "Create ethical guidelines for data handling in their organization",
-                "mcqs": [
-                    {
-                        "question": "What makes an ethical guideline most effective in practice?",
-                        "options": ["Legal language", "Clear actionable steps", "Comprehensive coverage", "Management endorsement"],
-                        "correct": 1,
-                        "explanation": "Clear, actionable steps enable practical implementation by all team members"
-                    },
-                    {
-                        "question": "How often should organizational ethical guidelines be reviewed?",
-                        "options": ["Never", "Annually", "When regulations change", "Continuously with regular formal reviews"],
-                        "correct": 3,
-                        "explanation": "Continuous monitoring with regular formal reviews ensures guidelines stay current and effective"
-                    }
-                ],
-                "short_answer": {
-                    "question": "Design a 3-step ethical checklist that your team could use before implementing any new data-related feature. Explain your rationale for each step.",
-                    "rubric": "Answer should include: 1) Three clear steps (3 pts), 2) Practical applicability (3 pts), 3) Rationale for each step (3 pts), 4) Implementation considerations (1 pt). Total: 10 points",
-                    "sample_answer": "1) Data necessity check (is this data essential?), 2) Consent verification (do we have proper permission?), 3) Impact assessment (what are potential harms?). Each step prevents common ethical violations while being quick enough for daily use."
-                }
-            },
-            {
-                "lesson_title": "Lesson 4: Practical Application and Monitoring",
-                "objective_measured": "Apply ethical principles to real-world data scenarios",
-                "mcqs": [
-                    {
-                        "question": "When facing time pressure, what is the best approach to ethical decision-making?",
-                        "options": ["Skip ethical review", "Use pre-established guidelines", "Consult legal team", "Postpone decision"],
-                        "correct": 1,
-                        "explanation": "Pre-established guidelines enable quick but ethically sound decisions under pressure"
-                    },
-                    {
-                        "question": "What is the most important metric for monitoring ethical compliance?",
-                        "options": ["Number of policies", "Stakeholder feedback", "Audit frequency", "Training completion rates"],
-                        "correct": 1,
-                        "explanation": "Stakeholder feedback provides real-world insight into ethical impact of decisions"
-                    }
-                ],
-                "short_answer": {
-                    "question": "You discover your team has been using customer data in a way that's technically legal but ethically questionable. How do you address this situation and prevent future occurrences?",
-                    "rubric": "Answer should include: 1) Immediate response (2 pts), 2) Investigation approach (2 pts), 3) Corrective actions (3 pts), 4) Prevention measures (3 pts). Total: 10 points",
-                    "sample_answer": "Immediately stop questionable use, conduct stakeholder impact assessment, implement corrective measures (data deletion/notification), establish stronger review processes, and create regular ethical audits to prevent recurrence."
-                }
-            }
-        ]
-    
-    def _extract_review(self, result):
-        return "PASS: Multi-agent review confirms strong alignment between objectives, lessons, and assessments. The curriculum provides comprehensive coverage of data ethics with practical application opportunities."
-    
-    def _create_markdown(self, course_idea, target_audience, objectives, lessons, assessments):
-        md = f"# {course_idea} Syllabus\n"
-        md += f"**Target Audience:** {target_audience}\n\n"
-        md += "*Generated by CrewAI Multi-Agent Collaboration*\n\n"
+    def _assessment_item(self, lesson: dict, objective: str, index: int, problem: str = None):
+        raw, assessment = self._run_item(
+            lambda: create_assessment_task(self.assessment_agent, lesson, objective),
+            parse_assessment, f"assessment for '{lesson['title']}'", "assessments", index, problem
+        )
+        return raw, self._link_assessment(assessment, lesson, objective)
+    
+    @staticmethod
+    def _link_assessment(assessment: dict, lesson: dict, objective: str) -> dict:
+        assessment["lesson_title"] = assessment["lesson_title"] or lesson["title"]
+        assessment["objective_measured"] = assessment["objective_measured"] or objective
+        return assessment
+    
+    def _run_fanout(self, course_idea: str, target_audience: str, on_event: EventCallback = None):
+        print("🎯 Objective Agent drafting objectives...")
+        self._emit(on_event, TASK_START, "objectives")
+        objectives_task = lambda: create_objectives_task(self.objective_agent, course_idea, target_audience)
+        raw = self._kickoff_task(objectives_task(), "objectives")
+        objectives = self._parse_or_repair(raw, parse_objectives, objectives_task, "objectives", "objectives")
+        self._emit(on_event, TASK_COMPLETE, "objectives", raw=raw)
+        self._emit(on_event, PARTIAL_OUTPUT, "objectives", raw=raw, data=objectives)
+        
+        print(f"🤖 Fanning out {len(objectives)} lesson/assessment tasks (max {self.max_workers} workers)...")
+        lessons = [None] * len(objectives)
+        assessments = [None] * len(objectives)
+        everything = range(len(objectives))
+        self._run_chains(objectives, lessons, assessments, everything, everything, on_event)
+        review_notes = self._review(course_idea, target_audience, objectives, lessons, assessments, on_event)
+        return objectives, lessons, assessments, review_notes
+    
+    def _run_hierarchical(self, course_idea: str, target_audience: str, on_event: EventCallback = None):
+        """
+        Course -> modules -> objectives -> lessons/assessments. Modules run in
+        parallel and each only sees the compact outline, so per-call context
+        stays flat however large the course gets.
+        """
+        print(f"🗂️ Objective Agent outlining {self.modules} modules...")
+        self._emit(on_event, TASK_START, "objectives")
+        outline_task = lambda: create_outline_task(self.objective_agent, course_idea, target_audience, self.modules)
+        raw = self._kickoff_task(outline_task(), "objectives", outline=True)
+        outline = self._parse_or_repair(raw, parse_outline, outline_task, "course outline", "objectives")
+        self._emit(on_event, TASK_COMPLETE, "objectives", raw=raw)
         
-        # Learning objectives section
-        md += "## Learning Objectives\n"
-        for i, obj in enumerate(objectives, 1):
-            md += f"{i}. {obj}\n"
-        md += "\n"
+        # Module workers report through this queue so events still reach
+        # on_event on the calling thread.
+        relay = queue.Queue()
+        # max_workers bounds the whole run: it is split between concurrent
+        # modules and the lesson/assessment chains inside each of them.
+        module_workers = max(1, min(len(outline), self.max_workers))
+        chain_workers = max(1, self.max_workers // module_workers)
+        print(f"🤖 Generating {len(outline)} modules in parallel "
+              f"({module_workers} at a time, {chain_workers} chain(s) each)...")
+        with ThreadPoolExecutor(max_workers=module_workers, thread_name_prefix="module") as pool:
+            futures = [
+                self._submit(pool, self._run_module, course_idea, target_audience, outline, m,
+                             lambda event, m=m: relay.put(dataclasses.replace(event, module=m)), chain_workers)
+                for m in range(len(outline))
+            ]
+            while not all(future.done() for future in futures) or not relay.empty():
+                try:
+                    event = relay.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                if on_event:
+                    on_event(event)
+            results = [future.result() for future in futures]
         
-        # Lessons section
-        for i, (obj, lesson) in enumerate(zip(objectives, lessons), 1):
-            md += f"## Lesson {i}: {lesson['title']}\n"
-            md += f"**Learning Outcome:** {obj}\n\n"
-            md += f"**Hook:** {lesson['hook']}\n\n"
-            md += f"**Core Content:** {lesson['explain']}\n\n"
-            md += f"**Practice:** {lesson['practice']}\n\n"
-            md += f"**Reflection:** {lesson['reflect']}\n\n"
-            md += f"**Duration:** {lesson.get('seat_time', 60)} minutes\n\n"
-            md += "---\n\n"
+        objectives, lessons, assessments, modules = [], [], [], []
+        for module, (module_objectives, module_lessons, module_assessments, notes) in zip(outline, results):
+            objectives += module_objectives
+            lessons += module_lessons
+            assessments += module_assessments
+            modules.append(Module(module["title"], module["summary"], len(module_objectives), notes))
+        review_notes = self._course_review(course_idea, target_audience, modules,
+                                           objectives, lessons, assessments, on_event)
+        return objectives, lessons, assessments, review_notes, "hierarchical_modules", modules
+    
+    def _run_module(self, course_idea: str, target_audience: str, outline, m: int, on_event: EventCallback,
+                    max_workers: int = None):
+        title = outline[m]["title"]
+        self._emit(on_event, TASK_START, "objectives")
+        objectives_task = lambda: create_module_objectives_task(
+            self.objective_agent, course_idea, target_audience, outline, m
+        )
+        raw = self._kickoff_task(objectives_task(), "objectives", module=m)
+        objectives = self._parse_or_repair(raw, parse_objectives, objectives_task, f"objectives of '{title}'",
+                                           "objectives")
+        self._emit(on_event, TASK_COMPLETE, "objectives", raw=raw)
+        self._emit(on_event, PARTIAL_OUTPUT, "objectives", raw=raw, data=objectives)
+        
+        lessons = [None] * len(objectives)
+        assessments = [None] * len(objectives)
+        everything = range(len(objectives))
+        self._run_chains(objectives, lessons, assessments, everything, everything, on_event,
+                         max_workers=max_workers)
+        review_notes = self._review(f"{course_idea}: {title}", target_audience, objectives, lessons, assessments,
+                                    on_event)
+        return objectives, lessons, assessments, review_notes
+    
+    def _course_review(self, course_idea: str, target_audience: str, modules: List[Module],
+                       objectives, lessons, assessments, on_event: EventCallback = None) -> str:
+        """The light course-level pass over the per-module reviews."""
+        # Cross-module duplicates only show up over the whole course, and the
+        # local checks are cheap enough to run on all of it. An LLM review
+        # (always, or when they are borderline) only reads the module verdicts.
+        return self._review(
+            course_idea, target_audience, objectives, lessons, assessments, on_event,
+            llm_review=lambda: self._run_course_review(course_idea, target_audience, modules, on_event)
+        )
+    
+    def _run_course_review(self, course_idea: str, target_audience: str, modules: List[Module],
+                           on_event: EventCallback = None) -> str:
+        print("✅ Quality Reviewer checking the course outline...")
+        self._emit(on_event, TASK_START, "review")
+        summaries = [{"title": m.title, "lessons": m.size, "verdict": (m.review_notes.strip().splitlines() or [""])[0]}
+                     for m in modules]
+        review_task = lambda: create_course_review_task(self.review_agent, course_idea, target_audience, summaries)
+        raw = self._kickoff_task(review_task(), "review", course=True)
+        review_notes = self._parse_or_repair(raw, parse_review, review_task, "course review", "review")
+        self._emit(on_event, TASK_COMPLETE, "review", raw=raw)
+        self._emit(on_event, PARTIAL_OUTPUT, "review", raw=raw, data=review_notes)
+        return review_notes
+    
+    def _regenerate(self, course_idea: str, target_audience: str, objectives: List[str],
+                    forced: set, on_event: EventCallback = None, workflow_type: str = "incremental_regeneration",
+                    modules: List[Module] = ()):
+        # Look every node up by its inputs; misses and forced objectives are
+        # the roots of the stale subgraph.
+        count = len(objectives)
+        lessons = [None] * count
+        assessments = [None] * count
+        roots = [Node("objectives", i) for i in forced]
+        for i, objective in enumerate(objectives):
+            lessons[i] = self.memo.get(lesson_key(course_idea, target_audience, objective))
+            if lessons[i] is None:
+                roots.append(Node("lessons", i))
+                continue
+            assessments[i] = self.memo.get(assessment_key(objective, lessons[i]))
+            if assessments[i] is None:
+                roots.append(Node("assessments", i))
+        stale = downstream(roots, count)
+        lesson_indices = [node.index for node in stale if node.stage == "lessons"]
+        assessment_indices = [node.index for node in stale if node.stage == "assessments"]
+        print(f"🧩 {len(lesson_indices)} lesson(s) and {len(assessment_indices)} assessment(s) of {count} are stale")
+        
+        # Forced items get a different prompt so the response cache cannot
+        # hand back the very lesson that was rejected.
+        problems = {i: "it was rejected in review; write a different lesson for the same objective"
+                    for i in forced}
+        self._run_chains(objectives, lessons, assessments, lesson_indices, assessment_indices, on_event, problems)
+        review_notes = None
+        if Node("review") not in stale:
+            review_notes = self.memo.get(review_key(course_idea, target_audience, objectives, lessons, assessments))
+        if review_notes is None and modules:
+            changed = set(lesson_indices) | set(assessment_indices) | forced
+            modules = self._rereview_modules(course_idea, target_audience, modules, changed,
+                                             objectives, lessons, assessments, on_event)
+            review_notes = self._course_review(course_idea, target_audience, modules,
+                                               objectives, lessons, assessments, on_event)
+        elif review_notes is None:
+            review_notes = self._review(course_idea, target_audience, objectives, lessons, assessments, on_event)
+        return objectives, lessons, assessments, review_notes, workflow_type, list(modules)
+    
+    def _rereview_modules(self, course_idea: str, target_audience: str, modules: List[Module], changed: set,
+                          objectives, lessons, assessments, on_event: EventCallback = None) -> List[Module]:
+        """Review again only the modules holding a changed item; the others keep their notes."""
+        reviewed, start = [], 0
+        for module in modules:
+            end = start + module.size
+            if any(start <= i < end for i in changed):
+                print(f"🔁 Re-reviewing module '{module.title}'")
+                notes = self._review(f"{course_idea}: {module.title}", target_audience, objectives[start:end],
+                                     lessons[start:end], assessments[start:end], on_event)
+                module = dataclasses.replace(module, review_notes=notes)
+            reviewed.append(module)
+            start = end
+        return reviewed
+    
+    def _run_chains(self, objectives, lessons, assessments, lesson_indices, assessment_indices,
+                    on_event: EventCallback = None, problems: dict = None, max_workers: int = None):
+        """Run lesson -> assessment chains on the pool, filling ``lessons``/``assessments`` in place."""
+        lesson_indices = set(lesson_indices)
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers, thread_name_prefix="curriculum") as pool:
+            pending = {}
+            for i in sorted(lesson_indices):
+                self._emit(on_event, TASK_START, "lessons", index=i)
+                pending[self._submit(
+                    pool, self._lesson_item, objectives[i], i, (problems or {}).get(i)
+                )] = ("lessons", i)
+            # Assessments whose lesson is still valid can start right away.
+            for i in sorted(set(assessment_indices) - lesson_indices):
+                self._emit(on_event, TASK_START, "assessments", index=i)
+                pending[self._submit(pool, self._assessment_item, lessons[i], objectives[i], i)] = ("assessments", i)
+            
+            # Events are emitted here on the calling thread; workers only run
+            # tasks. Each finished lesson immediately spawns its assessment.
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, i = pending.pop(future)
+                    raw, item = future.result()
+                    self._emit(on_event, TASK_COMPLETE, stage, index=i, raw=raw)
+                    self._emit(on_event, PARTIAL_OUTPUT, stage, index=i, raw=raw, data=item)
+                    if stage == "lessons":
+                        lessons[i] = item
+                        self._emit(on_event, TASK_START, "assessments", index=i)
+                        pending[self._submit(pool, self._assessment_item, item, objectives[i], i)] = ("assessments", i)
+                    else:
+                        assessments[i] = item
+    
+    def _review(self, course_idea: str, target_audience: str, objectives, lessons, assessments,
+                on_event: EventCallback = None, llm_review=None) -> str:
+        # llm_review replaces the full reviewer call, e.g. with the course-level pass
+        llm_review = llm_review or (lambda: self._run_review(
+            course_idea, target_audience, objectives, lessons, assessments, on_event
+        ))
+        if self.review_mode == "llm":
+            return llm_review()
+        from .validator import validate_curriculum
         
-        return md
+        report = validate_curriculum(objectives, lessons, assessments)
+        print(f"🔎 Local alignment check: {report.verdict} (score {report.score:.2f})")
+        span = current_span.get()
+        if span is not None:
+            span.root.set(local_review=report.verdict, local_review_score=report.score)
+        if self.review_mode == "auto" and report.verdict == "BORDERLINE":
+            return f"{llm_review()}\n\n{report.to_notes()}"
+        review_notes = report.to_notes()
+        self._emit(on_event, TASK_START, "review")
+        self._emit(on_event, TASK_COMPLETE, "review", raw=review_notes)
+        self._emit(on_event, PARTIAL_OUTPUT, "review", raw=review_notes, data=review_notes)
+        return review_notes
+    
+    def _run_review(self, course_idea: str, target_audience: str, objectives, lessons, assessments,
+                    on_event: EventCallback = None) -> str:
+        print("✅ Quality Reviewer checking alignment...")
+        self._emit(on_event, TASK_START, "review")
+        review_task = lambda: create_review_task(self.review_agent, {
+            "course_idea": course_idea,
+            "target_audience": target_audience,
+            "objectives": objectives,
+            "lessons": lessons,
+            "assessments": assessments
+        })
+        raw = self._kickoff_task(review_task(), "review")
+        review_notes = self._parse_or_repair(raw, parse_review, review_task, "review", "review")
+        self._emit(on_event, TASK_COMPLETE, "review", raw=raw)
+        self._emit(on_event, PARTIAL_OUTPUT, "review", raw=raw, data=review_notes)
+        return review_notes
+    
+    def _fill_missing(self, items, errors, count, make_item, label):
+        """Regenerate only the items that are missing or failed validation, in parallel."""
+        items = (list(items) + [None] * count)[:count]
+        failed = {i: errors.get(i, f"this {label} was missing from the combined output")
+                  for i, item in enumerate(items) if item is None}
+        if not failed:
+            return items
+        print(f"🔧 Re-prompting {len(failed)} {label}(s) individually")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="curriculum") as pool:
+            futures = {i: self._submit(pool, make_item, i, problem) for i, problem in failed.items()}
+            for i, future in futures.items():
+                items[i] = future.result()[1]
+        return items
+    
+    def _extract_objectives(self, raw: str, course_idea: str, target_audience: str):
+        return self._parse_or_repair(
+            raw, parse_objectives,
+            lambda: create_objectives_task(self.objective_agent, course_idea, target_audience),
+            "objectives", "objectives"
+        )
+    
+    def _extract_lessons(self, raw: str, objectives):
+        try:
+            items, errors = parse_lessons(raw)
+        except OutputParseError as e:
+            print(f"⚠️ Lessons output unusable ({e}); regenerating per objective")
+            items, errors = [], {}
+        # One blueprint per objective
+        return self._fill_missing(
+            items, errors, len(objectives),
+            lambda i, problem: self._lesson_item(objectives[i], i, problem), "lesson"
+        )
+    
+    def _extract_assessments(self, raw: str, objectives, lessons):
+        try:
+            items, errors = parse_assessments(raw)
+        except OutputParseError as e:
+            print(f"⚠️ Assessments output unusable ({e}); regenerating per lesson")
+            items, errors = [], {}
+        assessments = self._fill_missing(
+            items, errors, len(lessons),
+            lambda i, problem: self._assessment_item(lessons[i], objectives[i], i, problem), "assessment"
+        )
+        return [self._link_assessment(a, l, o) for a, l, o in zip(assessments, lessons, objectives)]
+    
+    def _extract_review(self, raw: str, review_task):
+        return self._parse_or_repair(raw, parse_review, review_task, "review", "review")
@@ -0,0 +1,35 @@
+"""
+Progress events emitted by CurriculumCrew while a curriculum is generated.
+
+Pass a callback as ``on_event`` to ``CurriculumCrew.generate_curriculum`` to
+receive them. Events are always delivered on the thread that called
+``generate_curriculum``, so UI code can update widgets directly.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+STAGES = ("objectives", "lessons", "assessments", "review")
+
+TASK_START = "task_start"
+TASK_COMPLETE = "task_complete"
+PARTIAL_OUTPUT = "partial_output"
+
+
+@dataclass
+class CrewEvent:
+    kind: str
+    stage: str
+    # Item position for per-objective tasks in fan-out mode, None for whole-stage tasks.
+    index: Optional[int] = None
+    raw: Optional[str] = None
+    data: Any = None
+    # Module position in hierarchical mode; ``index`` then counts within the module.
+    module: Optional[int] = None
+
+    @property
+    def step(self) -> int:
+        return STAGES.index(self.stage) + 1
+
+
+EventCallback = Callable[[CrewEvent], None]
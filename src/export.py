@@ -0,0 +1,157 @@
+"""
+Streaming exporters for a finished curriculum.
+
+Every format is produced as an iterator of small ``bytes`` chunks straight
+from the structured data (objectives, lessons, assessments), so a syllabus is
+never assembled into one big string and memory stays flat however many
+lessons a catalog has. Chunks can go to a file, a socket or a download:
+
+    write_export(result, "ndjson", "syllabus.ndjson")
+    write_export(result, "md", sys.stdout.buffer)
+
+orjson is used for item serialization when installed, the stdlib otherwise.
+"""
+
+import html
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+from .models import dumps
+
+FORMATS = ("md", "json", "ndjson", "html")
+MIME_TYPES = {
+    "md": "text/markdown",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "html": "text/html",
+}
+
+
+def iter_markdown(curriculum) -> Iterator[bytes]:
+    objectives = curriculum.learning_objectives
+    yield (f"# {curriculum.course_idea} Syllabus\n"
+           f"**Target Audience:** {curriculum.target_audience}\n\n"
+           "*Generated by CrewAI Multi-Agent Collaboration*\n\n"
+           "## Learning Objectives\n").encode("utf-8")
+    for i, obj in enumerate(objectives, 1):
+        yield f"{i}. {obj}\n".encode("utf-8")
+    yield b"\n"
+    module_starts = curriculum.module_starts()
+    for i, (obj, lesson) in enumerate(zip(objectives, curriculum.lesson_blueprints), 1):
+        if i - 1 in module_starts:
+            module = module_starts[i - 1]
+            yield f"# Module: {module.title}\n{module.summary}\n\n".encode("utf-8")
+        yield (f"## Lesson {i}: {lesson.title}\n"
+               f"**Learning Outcome:** {obj}\n\n"
+               f"**Hook:** {lesson.hook}\n\n"
+               f"**Core Content:** {lesson.explain}\n\n"
+               f"**Practice:** {lesson.practice}\n\n"
+               f"**Reflection:** {lesson.reflect}\n\n"
+               f"**Duration:** {lesson.seat_time} minutes\n\n"
+               "---\n\n").encode("utf-8")
+
+
+def _iter_array(items: Iterable[Any]) -> Iterator[bytes]:
+    yield b"["
+    for i, item in enumerate(items):
+        yield (b",\n" if i else b"\n") + dumps(item.to_dict())
+    yield b"\n]"
+
+
+def iter_json(curriculum) -> Iterator[bytes]:
+    """The ``package_json`` document, written item by item."""
+    yield b'{"course_metadata":' + dumps(curriculum.course_metadata)
+    yield b',\n"objectives":' + dumps(curriculum.learning_objectives)
+    if curriculum.modules:
+        yield b',\n"modules":'
+        yield from _iter_array(curriculum.modules)
+    yield b',\n"lessons":'
+    yield from _iter_array(curriculum.lesson_blueprints)
+    yield b',\n"assessments":'
+    yield from _iter_array(curriculum.assessments)
+    yield b',\n"review_notes":' + dumps(curriculum.review_notes)
+    yield b',\n"agent_collaboration":' + dumps(curriculum.agent_collaboration)
+    yield b"}\n"
+
+
+def iter_ndjson(curriculum) -> Iterator[bytes]:
+    """One record per line: the course, then each lesson and assessment, then the review."""
+    yield dumps({"type": "course", "course_idea": curriculum.course_idea,
+                 "target_audience": curriculum.target_audience,
+                 "objectives": curriculum.learning_objectives}) + b"\n"
+    for i, module in enumerate(curriculum.modules):
+        yield dumps({"type": "module", "index": i, **module.to_dict()}) + b"\n"
+    for i, (objective, lesson) in enumerate(zip(curriculum.learning_objectives, curriculum.lesson_blueprints)):
+        yield dumps({"type": "lesson", "index": i, "objective": objective, **lesson.to_dict()}) + b"\n"
+    for i, assessment in enumerate(curriculum.assessments):
+        yield dumps({"type": "assessment", "index": i, **assessment.to_dict()}) + b"\n"
+    yield dumps({"type": "review", "notes": curriculum.review_notes}) + b"\n"
+
+
+def iter_html(curriculum) -> Iterator[bytes]:
+    esc = html.escape
+    title = esc(f"{curriculum.course_idea} Syllabus")
+    yield (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title></head><body>\n'
+           f"<h1>{title}</h1>\n"
+           f"<p><strong>Target Audience:</strong> {esc(curriculum.target_audience)}</p>\n"
+           "<h2>Learning Objectives</h2>\n<ol>\n").encode("utf-8")
+    for objective in curriculum.learning_objectives:
+        yield f"<li>{esc(objective)}</li>\n".encode("utf-8")
+    yield b"</ol>\n"
+    module_starts = curriculum.module_starts()
+    for i, (objective, lesson) in enumerate(zip(curriculum.learning_objectives, curriculum.lesson_blueprints), 1):
+        if i - 1 in module_starts:
+            module = module_starts[i - 1]
+            yield f"<h2>Module: {esc(module.title)}</h2>\n<p>{esc(module.summary)}</p>\n".encode("utf-8")
+        yield (f"<section>\n<h2>Lesson {i}: {esc(lesson.title)}</h2>\n"
+               f"<p><strong>Learning Outcome:</strong> {esc(objective)}</p>\n"
+               f"<p><strong>Hook:</strong> {esc(lesson.hook)}</p>\n"
+               f"<p><strong>Core Content:</strong> {esc(lesson.explain)}</p>\n"
+               f"<p><strong>Practice:</strong> {esc(lesson.practice)}</p>\n"
+               f"<p><strong>Reflection:</strong> {esc(lesson.reflect)}</p>\n"
+               f"<p><strong>Duration:</strong> {lesson.seat_time} minutes</p>\n"
+               "</section>\n").encode("utf-8")
+    yield b"<h2>Assessments</h2>\n"
+    for assessment in curriculum.assessments:
+        yield f"<h3>{esc(assessment.lesson_title)}</h3>\n<ol>\n".encode("utf-8")
+        for mcq in assessment.mcqs:
+            options = "".join(f"<li>{esc(str(option))}</li>" for option in mcq.options)
+            yield f"<li>{esc(mcq.question)}<ol type=\"A\">{options}</ol></li>\n".encode("utf-8")
+        short_answer = assessment.short_answer.question if assessment.short_answer else ""
+        yield f"</ol>\n<p><strong>Short Answer:</strong> {esc(short_answer)}</p>\n".encode("utf-8")
+    yield (f"<h2>Quality Review</h2>\n<pre>{esc(curriculum.review_notes)}</pre>\n"
+           "</body></html>\n").encode("utf-8")
+
+
+EXPORTERS: Dict[str, Callable[[Any], Iterator[bytes]]] = {
+    "md": iter_markdown,
+    "json": iter_json,
+    "ndjson": iter_ndjson,
+    "html": iter_html,
+}
+
+
+def iter_export(curriculum, fmt: str) -> Iterator[bytes]:
+    if fmt not in EXPORTERS:
+        raise ValueError(f"unknown export format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    return EXPORTERS[fmt](curriculum)
+
+
+def write_export(curriculum, fmt: str, target) -> int:
+    """
+    Stream ``curriculum`` as ``fmt`` to ``target``: a path (written atomically),
+    a binary file object or a socket. Returns the number of bytes written.
+    """
+    if isinstance(target, (str, os.PathLike)):
+        tmp = f"{os.fspath(target)}.tmp"
+        with open(tmp, "wb") as f:
+            written = write_export(curriculum, fmt, f)
+        os.replace(tmp, target)
+        return written
+    send = target.sendall if hasattr(target, "sendall") else target.write
+    written = 0
+    for chunk in iter_export(curriculum, fmt):
+        send(chunk)
+        written += len(chunk)
+    return written
+
@@ -0,0 +1,102 @@
+"""
+Dependency graph of the curriculum pipeline with memoized per-item outputs.
+
+    objective[i] ── lesson[i] ── assessment[i] ──┐
+         └──────────────────────┴────────────────┴── review
+
+Each lesson, assessment and review is memoized under a hash of exactly the
+inputs it was generated from. After an objective is edited (or an item is
+forced stale), only the nodes downstream of it miss the memo, so a
+one-objective change costs its lesson, its assessment and the review.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+
+class Node(NamedTuple):
+    stage: str
+    index: Optional[int] = None
+
+
+def dependencies(node: Node, count: int) -> List[Node]:
+    """Direct upstream nodes of ``node`` in a course with ``count`` objectives."""
+    if node.stage == "lessons":
+        return [Node("objectives", node.index)]
+    if node.stage == "assessments":
+        return [Node("objectives", node.index), Node("lessons", node.index)]
+    if node.stage == "review":
+        return [Node(stage, i) for i in range(count) for stage in ("objectives", "lessons", "assessments")]
+    return []
+
+
+def nodes(count: int) -> List[Node]:
+    """Every node, in an order where dependencies come first."""
+    return (
+        [Node("objectives", i) for i in range(count)]
+        + [Node("lessons", i) for i in range(count)]
+        + [Node("assessments", i) for i in range(count)]
+        + [Node("review")]
+    )
+
+
+def downstream(roots: Iterable[Node], count: int) -> List[Node]:
+    """``roots`` plus everything that transitively depends on them, in execution order."""
+    stale = set(roots)
+    for node in nodes(count):
+        if node not in stale and any(dep in stale for dep in dependencies(node, count)):
+            stale.add(node)
+    return [node for node in nodes(count) if node in stale]
+
+
+def node_key(stage: str, *inputs: Any) -> str:
+    payload = json.dumps([stage, inputs], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lesson_key(course_idea: str, target_audience: str, objective: str) -> str:
+    return node_key("lessons", course_idea, target_audience, objective)
+
+
+def assessment_key(objective: str, lesson: Dict[str, Any]) -> str:
+    return node_key("assessments", objective, lesson)
+
+
+def review_key(course_idea: str, target_audience: str, objectives: Sequence[str],
+               lessons: Sequence[Dict[str, Any]], assessments: Sequence[Dict[str, Any]]) -> str:
+    return node_key("review", course_idea, target_audience, objectives, lessons, assessments)
+
+
+class MemoStore:
+    """Thread-safe in-memory memo of node outputs keyed by their inputs."""
+
+    def __init__(self):
+        self._items: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                # Callers annotate items in place, so never hand out the stored copy.
+                return copy.deepcopy(self._items[key])
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._items[key] = copy.deepcopy(value)
+
+    def remember(self, course_idea: str, target_audience: str, objectives: Sequence[str],
+                 lessons: Sequence[Dict[str, Any]], assessments: Sequence[Dict[str, Any]],
+                 review_notes: str) -> None:
+        """Memoize every node of a finished curriculum."""
+        for objective, lesson, assessment in zip(objectives, lessons, assessments):
+            self.set(lesson_key(course_idea, target_audience, objective), lesson)
+            self.set(assessment_key(objective, lesson), assessment)
+        self.set(review_key(course_idea, target_audience, objectives, lessons, assessments), review_notes)
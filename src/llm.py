@@ -2,15 +2,159 @@
 Centralised LLM configuration for CrewAI
 """
 
+import json
 import os
-from functools import lru_cache
+import time
+from functools import lru_cache, partial
+from typing import Any, Optional, Tuple
+
 from crewai import LLM
 
-@lru_cache
-def get_llm():
-    return LLM(
-        model= os.getenv("LLM_MODEL"),
-        api_key=os.getenv("DEEPSEEK_API_KEY"),
-        base_url=os.getenv("DEEPSEEK_BASE_URL", "https://api.openai.com/v1"),
+from .cache import ResponseCache, current_refresh, get_response_cache, make_key
+from .cancellation import check_cancelled
+from .context import collect_usage, current_ledger, estimate_tokens
+from .router import Provider, Router, get_router
+from .scheduler import get_scheduler, scheduler_enabled
+from .tracing import get_tracer
+
+
+# Tokens/min budget reserved for a completion when max_tokens is unset;
+# corrected to the real size once the response arrives.
+OUTPUT_TOKEN_ESTIMATE = 1024
+
+
+class CachedLLM(LLM):
+    """
+    LLM whose completions are served from the on-disk response cache when
+    possible (pass ``cache=None`` to always call the provider, or run under
+    ``cache.refresh_scope()`` to skip lookups for one run). Provider calls
+    are admitted, paced and retried by the shared scheduler (src/scheduler.py).
+    Every call is traced as an ``llm`` span.
+    """
+
+    def __init__(self, *args: Any, role: Optional[str] = None, cache: Optional[ResponseCache] = None,
+                 provider: Optional[str] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.role = role
+        self.response_cache = cache
+        self.provider = provider
+
+    def cache_key(self, messages: Any, tools: Any = None) -> str:
+        return make_key(self.model, self.base_url, self.temperature, messages, tools=tools)
+
+    def call(self, messages: Any, *args: Any, **kwargs: Any):
+        return self.call_with_info(messages, *args, **kwargs)[0]
+
+    def call_with_info(self, messages: Any, *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """Like ``call`` but also reports whether the response came from the cache."""
+        check_cancelled()
+        prompt = messages if isinstance(messages, str) else json.dumps(messages, ensure_ascii=False, default=str)
+        input_tokens = estimate_tokens(prompt)
+        with get_tracer().span("llm.call", "llm", role=self.role, model=self.model, provider=self.provider,
+                               input_tokens=input_tokens) as span:
+            key = None
+            if self.response_cache is not None:
+                tools = kwargs.get("tools", args[0] if args else None)
+                key = self.cache_key(messages, tools)
+                cached = None
+                if not current_refresh.get():
+                    cached = self.response_cache.get(key)
+                    ledger = current_ledger.get()
+                    if ledger is not None:
+                        ledger.record_cache(cached is not None)
+                if cached is not None:
+                    span.set(cache_hit=True, output_tokens=estimate_tokens(cached))
+                    return cached, True
+
+            request = partial(super().call, messages, *args, **kwargs)
+            budget = input_tokens + (getattr(self, "max_tokens", None) or OUTPUT_TOKEN_ESTIMATE)
+            with collect_usage() as usage:
+                if scheduler_enabled():
+                    response = get_scheduler().call(
+                        self.provider, self.model, budget, request,
+                        count_tokens=lambda r: input_tokens + estimate_tokens(r if isinstance(r, str) else ""),
+                        on_wait=lambda seconds, retries: span.set(scheduler_wait_s=round(seconds, 3), retries=retries),
+                    )
+                else:
+                    response = request()
+            if usage:
+                # Provider-side prompt caching, when the provider reports it
+                span.set(cached_input_tokens=usage["cached_tokens"], uncached_input_tokens=usage["uncached_tokens"])
+            ledger = current_ledger.get()
+            if ledger is not None:
+                # Usage is only captured by the pooled client (openai/ models
+                # with LLM_POOL=1); other calls are counted as unreported.
+                ledger.record_llm(self.role, self.model, usage)
+            span.set(cache_hit=False, output_tokens=estimate_tokens(response if isinstance(response, str) else ""))
+            if key is not None and isinstance(response, str) and response:
+                self.response_cache.set(key, response)
+            return response, False
+
+
+class RoutedLLM(LLM):
+    """
+    One agent's LLM spread over several providers (see src/router.py). Calls
+    go to the fastest healthy target and fail over to the next on errors;
+    crewai sees the attributes of the preferred target.
+    """
+
+    def __init__(self, targets: Any, role: Optional[str] = None):
+        primary, _ = targets[0]
+        super().__init__(model=primary.model, api_key=primary.api_key, base_url=primary.base_url,
+                         temperature=primary.temperature)
+        self.targets = targets  # [(CachedLLM, Provider), ...]
+        self.role = role
+
+    def call(self, messages: Any, *args: Any, **kwargs: Any):
+        error = None
+        for llm, provider in Router.order(self.targets, provider_of=lambda target: target[1]):
+            started = time.perf_counter()
+            try:
+                response, cache_hit = llm.call_with_info(messages, *args, **kwargs)
+            except Exception as e:
+                provider.record_failure()
+                print(f"⚠️ {provider.name} failed for {self.role or 'llm'} ({type(e).__name__}); failing over")
+                error = e
+                continue
+            if not cache_hit:
+                provider.record_success(time.perf_counter() - started)
+            return response
+        raise error
+
+
+def _cache_enabled(role: Optional[str]) -> bool:
+    if os.getenv("LLM_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return False
+    opted_out = {r.strip() for r in os.getenv("LLM_CACHE_OPT_OUT", "").split(",") if r.strip()}
+    return role not in opted_out
+
+
+def _target(provider: Provider, model: str, role: Optional[str], cache: bool) -> CachedLLM:
+    # Only litellm's OpenAI-compatible path accepts a preconfigured client
+    client = provider.client() if model.startswith("openai/") else None
+    return CachedLLM(
+        model=model,
+        api_key=provider.api_key,
+        base_url=provider.base_url,
         temperature=0.2,
+        role=role,
+        cache=get_response_cache() if cache and _cache_enabled(role) else None,
+        provider=provider.name,
+        # litellm reuses this client, and with it the provider's keep-alive pool
+        **({"client": client} if client is not None else {}),
     )
+
+
+@lru_cache
+def get_llm(role: Optional[str] = None, cache: bool = True):
+    """
+    Return the LLM for this agent role, routed over the configured providers and
+    cached unless disabled globally, for this role, or by the caller.
+    """
+    routes = get_router().routes(role)
+    if not routes:
+        raise RuntimeError("No LLM provider configured: set LLM_MODEL or <PROVIDER>_MODEL and _API_KEY")
+    targets = [(_target(provider, model, role, cache), provider) for provider, model in routes]
+    if len(targets) == 1:
+        return targets[0][0]
+    return RoutedLLM(targets, role=role)
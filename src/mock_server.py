@@ -0,0 +1,353 @@
+"""
+Local OpenAI-compatible stand-in for the curriculum agents.
+
+Serves ``POST /v1/chat/completions`` with schema-valid objectives, lessons,
+assessments and reviews, detected from the task prompt, so crews can run and be
+benchmarked without network access or tokens. Latency, jitter, token rate and
+error injection come from a named profile:
+
+    python -m src.mock_server --port 8089 --profile realistic
+
+then point the app at it with ``DEEPSEEK_BASE_URL=http://127.0.0.1:8089/v1``,
+``LLM_MODEL=openai/mock-curriculum`` and any ``DEEPSEEK_API_KEY``.
+
+Like hosted providers, the mock keeps a prefix cache: prompt prefixes seen
+before (in blocks of ``cache_block_tokens``) skip the simulated prefill time
+and are reported as ``usage.prompt_tokens_details.cached_tokens``.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .context import estimate_tokens
+
+
+@dataclass
+class MockProfile:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # Simulated generation speed; 0 means instant.
+    tokens_per_second: float = 0.0
+    # Simulated prompt processing speed for uncached prompt tokens; 0 means instant.
+    prefill_tokens_per_second: float = 0.0
+    # Prefix cache granularity; 0 disables the cache.
+    cache_block_tokens: int = 64
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_s: float = 1.0
+    malformed_rate: float = 0.0
+    truncate_rate: float = 0.0
+    seed: int = 0
+
+
+PROFILES = {
+    "instant": MockProfile(),
+    "fast": MockProfile(latency_ms=50, jitter_ms=10, tokens_per_second=2000, prefill_tokens_per_second=50000),
+    "realistic": MockProfile(latency_ms=400, jitter_ms=150, tokens_per_second=80, prefill_tokens_per_second=4000),
+    "flaky": MockProfile(latency_ms=200, jitter_ms=100, tokens_per_second=200, prefill_tokens_per_second=4000,
+                         error_rate=0.05,
+                         rate_limit_rate=0.05, malformed_rate=0.1, truncate_rate=0.05),
+}
+
+_VERBS = ["Analyze", "Evaluate", "Apply", "Create", "Compare", "Design", "Explain", "Justify"]
+_MODALITIES = ["hybrid", "online", "in-person"]
+
+
+def _payload(prompt: str) -> Dict[str, Any]:
+    # Task prompts end with "Input: {...}" (see src/tasks.py)
+    start = prompt.find("Input: {")
+    if start < 0:
+        return {}
+    try:
+        return json.JSONDecoder().raw_decode(prompt, start + len("Input: "))[0]
+    except ValueError:
+        return {}
+
+
+def objectives(topic: str, audience: str, n: int = 4) -> List[str]:
+    return [
+        f"{_VERBS[i % len(_VERBS)]} key aspects of {topic} relevant to {audience} (part {i + 1})"
+        for i in range(n)
+    ]
+
+
+def lesson(objective: str, i: int) -> Dict[str, Any]:
+    return {
+        "title": f"Lesson {i + 1}: {objective[:60]}",
+        "hook": f"Scenario: a team struggles with '{objective[:40]}'. What would you do?",
+        "explain": f"Guided walkthrough of the concepts behind: {objective}",
+        "practice": "Small-group exercise applying the framework to a realistic case",
+        "reflect": "Individual reflection on how this applies to your own work",
+        "seat_time": 60 + 15 * (i % 3),
+        "modality": _MODALITIES[i % len(_MODALITIES)],
+    }
+
+
+def assessment(title: str, i: int) -> Dict[str, Any]:
+    return {
+        "lesson_title": title,
+        "objective_measured": f"Objective {i + 1}",
+        "mcqs": [
+            {
+                "question": f"Which statement best reflects the core idea of '{title[:50]}'?",
+                "options": ["The correct principle", "A common misconception", "An unrelated idea", "None of these"],
+                "correct": 0,
+                "explanation": "The first option states the principle covered in the lesson.",
+            },
+            {
+                "question": f"What is the first step when applying '{title[:50]}' at work?",
+                "options": ["Skip analysis", "Identify stakeholders", "Wait for approval", "Automate everything"],
+                "correct": 1,
+                "explanation": "Identifying stakeholders frames every later decision.",
+            },
+        ],
+        "short_answer": {
+            "question": f"Describe how you would apply '{title[:50]}' to a situation from your work.",
+            "rubric": "Scenario (3 pts), application of the concept (4 pts), reflection on trade-offs (3 pts). Total: 10 points",
+            "sample_answer": "I would map the stakeholders, apply the framework step by step, and check the outcome.",
+        },
+    }
+
+
+def outline(topic: str, n: int) -> List[Dict[str, str]]:
+    return [{"title": f"Module {i + 1}: {topic} part {i + 1}",
+             "summary": f"Builds on module {i} with the next layer of {topic}." if i else f"Foundations of {topic}."}
+            for i in range(n)]
+
+
+def respond(prompt: str) -> Any:
+    """Return the structured answer a well-behaved agent would give for ``prompt``."""
+    data = _payload(prompt)
+    topic, audience = data.get("course_idea", "the topic"), data.get("target_audience", "learners")
+    if "Split the course in the input into" in prompt:
+        return outline(topic, int(data.get("module_count", 4)))
+    if "objectives for one module of a course" in prompt:
+        return objectives(data.get("module", {}).get("title", topic), audience)
+    if "SMART learning objectives for the course" in prompt:
+        return objectives(topic, audience)
+    if "lesson blueprint for each objective" in prompt:
+        texts = [o.get("text", "") for o in data.get("objectives", [])] or objectives(topic, audience)
+        return [lesson(text, i) for i, text in enumerate(texts)]
+    if "lesson blueprint for the objective" in prompt:
+        return lesson(data.get("objective", topic), 0)
+    if "assessment for each lesson" in prompt:
+        titles = [l.get("title", f"Lesson {i + 1}") for i, l in enumerate(data.get("lessons", []))]
+        return [assessment(title, i) for i, title in enumerate(titles or ["Lesson 1"])]
+    if "assessment for the lesson" in prompt:
+        return assessment((data.get("lessons") or [{}])[0].get("title", "Lesson"), 0)
+    if "Translate every string in the input" in prompt:
+        language = data.get("language", "xx")
+        return {key: f"[{language}] {text}" for key, text in data.get("segments", {}).items()}
+    if "Review the course outline" in prompt:
+        return "PASS: Modules progress from foundations to application without gaps or overlaps."
+    if "Review the curriculum" in prompt:
+        return ("PASS: Objectives, lessons and assessments are aligned; every lesson maps to one "
+                "objective and every assessment has two MCQs and a short answer.")
+    return "Acknowledged."
+
+
+# Prefix blocks remembered by the mock cache (LRU)
+MAX_CACHED_PREFIXES = 50000
+
+
+class MockLLMServer:
+    def __init__(self, profile: MockProfile):
+        self.profile = profile
+        self._random = random.Random(profile.seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "malformed": 0,
+                      "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "busy_seconds": 0.0}
+        self._prefixes: OrderedDict = OrderedDict()
+        self.httpd: Optional[ThreadingHTTPServer] = None
+
+    def _roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    def _cached_prefix(self, model: str, prompt: str) -> int:
+        """Characters of ``prompt`` covered by cached prefix blocks; caches every block of this prompt."""
+        block = self.profile.cache_block_tokens * 4
+        if not block:
+            return 0
+        digest, cached, hit = hashlib.sha256(model.encode("utf-8")).digest(), 0, True
+        with self._lock:
+            for end in range(block, len(prompt) + 1, block):
+                digest = hashlib.sha256(digest + prompt[end - block:end].encode("utf-8")).digest()
+                if hit and digest in self._prefixes:
+                    self._prefixes.move_to_end(digest)
+                    cached = end
+                else:
+                    hit = False
+                    self._prefixes[digest] = True
+            while len(self._prefixes) > MAX_CACHED_PREFIXES:
+                self._prefixes.popitem(last=False)
+        return cached
+
+    def _delay(self, completion_tokens: int, uncached_tokens: int = 0) -> float:
+        with self._lock:
+            jitter = self._random.uniform(-self.profile.jitter_ms, self.profile.jitter_ms)
+        seconds = max(0.0, self.profile.latency_ms + jitter) / 1000
+        if self.profile.prefill_tokens_per_second:
+            seconds += uncached_tokens / self.profile.prefill_tokens_per_second
+        if self.profile.tokens_per_second:
+            seconds += completion_tokens / self.profile.tokens_per_second
+        return seconds
+
+    def _record(self, **amounts) -> None:
+        with self._lock:
+            for key, value in amounts.items():
+                self.stats[key] += value
+
+    def complete(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, str], Dict[str, Any]]:
+        """Return (status, headers, payload) for one chat completion request."""
+        messages = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages if isinstance(m, dict))
+        self._record(requests=1)
+
+        if self._roll(self.profile.rate_limit_rate):
+            self._record(rate_limited=1)
+            return 429, {"Retry-After": str(self.profile.retry_after_s)}, {
+                "error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error"}}
+        if self._roll(self.profile.error_rate):
+            self._record(errors=1)
+            return 500, {}, {"error": {"message": "Internal error (mock)", "type": "server_error"}}
+
+        answer = respond(prompt)
+        content = answer if isinstance(answer, str) else json.dumps(answer, ensure_ascii=False)
+        if not isinstance(answer, str) and self._roll(self.profile.malformed_rate):
+            self._record(malformed=1)
+            content = f"Here is the result:\n```json\n{content[:-1]},{content[-1]}\n```\nLet me know if you need more."
+        elif not isinstance(answer, str) and self._roll(self.profile.truncate_rate):
+            self._record(malformed=1)
+            content = content[: max(1, int(len(content) * 0.8))]
+        # crewai agents expect a ReAct-style final answer
+        content = f"Thought: I now can give a great answer\nFinal Answer: {content}"
+
+        prompt_tokens = estimate_tokens(prompt)
+        cached_tokens = min(prompt_tokens, estimate_tokens(prompt[:self._cached_prefix(body.get("model", ""), prompt)]))
+        completion_tokens = estimate_tokens(content)
+        delay = self._delay(completion_tokens, prompt_tokens - cached_tokens)
+        time.sleep(delay)
+        self._record(prompt_tokens=prompt_tokens, cached_tokens=cached_tokens,
+                     completion_tokens=completion_tokens, busy_seconds=delay)
+        return 200, {}, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock-curriculum"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            # OpenAI's and DeepSeek's spellings of the cached share
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens,
+                      "prompt_tokens_details": {"cached_tokens": cached_tokens},
+                      "prompt_cache_hit_tokens": cached_tokens,
+                      "prompt_cache_miss_tokens": prompt_tokens - cached_tokens},
+        }
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving on a daemon thread and return the OpenAI base URL."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send(200, {}, {"object": "list", "data": [{"id": "mock-curriculum", "object": "model"}]})
+                elif self.path.rstrip("/") == "/stats":
+                    self._send(200, {}, {**server.stats, "profile": asdict(server.profile)})
+                else:
+                    self._send(404, {}, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {}, {"error": {"message": "not found"}})
+                    return
+                status, headers, payload = server.complete(body)
+                if status == 200 and body.get("stream"):
+                    self._stream(payload)
+                else:
+                    self._send(status, headers, payload)
+
+            def _send(self, status, headers, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, payload):
+                content = payload["choices"][0]["message"]["content"]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for start in range(0, len(content), 32):
+                    chunk = {"id": payload["id"], "object": "chat.completion.chunk", "model": payload["model"],
+                             "choices": [{"index": 0, "delta": {"content": content[start:start + 32]},
+                                          "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                final = {"id": payload["id"], "object": "chat.completion.chunk", "model": payload["model"],
+                         "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                         "usage": payload["usage"]}
+                self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, name="mock-llm", daemon=True).start()
+        return f"http://{host}:{self.httpd.server_address[1]}/v1"
+
+    def shutdown(self) -> None:
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+
+def start_mock_server(profile: str = "fast", port: int = 0, **overrides: Any) -> Tuple[MockLLMServer, str]:
+    settings = asdict(PROFILES[profile])
+    settings.update(overrides)
+    server = MockLLMServer(MockProfile(**settings))
+    return server, server.serve(port=port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible mock of the curriculum agents.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)  # src.service defaults to 8765
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    for field, default in asdict(MockProfile()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(default), default=None)
+    args = parser.parse_args(argv)
+
+    settings = asdict(PROFILES[args.profile])
+    settings.update({k: v for k, v in vars(args).items() if k in settings and v is not None})
+    server = MockLLMServer(MockProfile(**settings))
+    print(f"🧪 Mock LLM serving at {server.serve(args.host, args.port)} (profile {args.profile}: {settings})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Typed, slotted models for the items of a curriculum.
+
+``CurriculumOutput`` keeps its lessons and assessments as these objects, the
+single canonical copy of the data. ``package_json`` and ``package_md`` are
+views computed from them on demand. Agent output is still validated and
+normalized by the pydantic schemas in ``config.py`` before it gets here.
+
+Each model converts to and from plain dicts (``to_dict``/``from_dict``, the
+JSON layout) and to and from compact positional tuples (``to_tuple``/
+``from_tuple``), which ``CurriculumOutput.to_bytes`` uses for fast, small
+round-trips.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(slots=True)
+class Lesson:
+    title: str
+    hook: str
+    explain: str
+    practice: str
+    reflect: str
+    seat_time: int = 60
+    modality: str = "hybrid"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Lesson":
+        return cls(data["title"], data["hook"], data["explain"], data["practice"], data["reflect"],
+                   data.get("seat_time", 60), data.get("modality", "hybrid"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"title": self.title, "hook": self.hook, "explain": self.explain, "practice": self.practice,
+                "reflect": self.reflect, "seat_time": self.seat_time, "modality": self.modality}
+
+    @classmethod
+    def from_tuple(cls, values) -> "Lesson":
+        return cls(*values)
+
+    def to_tuple(self) -> tuple:
+        return (self.title, self.hook, self.explain, self.practice, self.reflect, self.seat_time, self.modality)
+
+
+@dataclass(slots=True)
+class MCQ:
+    question: str
+    options: List[str]
+    correct: int
+    explanation: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MCQ":
+        return cls(data["question"], list(data["options"]), data["correct"], data.get("explanation", ""))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"question": self.question, "options": self.options, "correct": self.correct,
+                "explanation": self.explanation}
+
+    @classmethod
+    def from_tuple(cls, values) -> "MCQ":
+        question, options, correct, explanation = values
+        return cls(question, list(options), correct, explanation)
+
+    def to_tuple(self) -> tuple:
+        return (self.question, self.options, self.correct, self.explanation)
+
+
+@dataclass(slots=True)
+class ShortAnswer:
+    question: str
+    rubric: str
+    sample_answer: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ShortAnswer":
+        return cls(data["question"], data["rubric"], data.get("sample_answer", ""))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"question": self.question, "rubric": self.rubric, "sample_answer": self.sample_answer}
+
+    @classmethod
+    def from_tuple(cls, values) -> "ShortAnswer":
+        return cls(*values)
+
+    def to_tuple(self) -> tuple:
+        return (self.question, self.rubric, self.sample_answer)
+
+
+@dataclass(slots=True)
+class Assessment:
+    lesson_title: str
+    objective_measured: str
+    mcqs: List[MCQ]
+    short_answer: Optional[ShortAnswer]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Assessment":
+        short_answer = data.get("short_answer")
+        return cls(
+            data.get("lesson_title", ""),
+            data.get("objective_measured", ""),
+            [MCQ.from_dict(m) for m in data.get("mcqs") or []],
+            ShortAnswer.from_dict(short_answer) if short_answer else None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "lesson_title": self.lesson_title,
+            "objective_measured": self.objective_measured,
+            "mcqs": [m.to_dict() for m in self.mcqs],
+            "short_answer": self.short_answer.to_dict() if self.short_answer else None,
+        }
+
+    @classmethod
+    def from_tuple(cls, values) -> "Assessment":
+        lesson_title, objective_measured, mcqs, short_answer = values
+        return cls(lesson_title, objective_measured, [MCQ.from_tuple(m) for m in mcqs],
+                   ShortAnswer.from_tuple(short_answer) if short_answer else None)
+
+    def to_tuple(self) -> tuple:
+        return (self.lesson_title, self.objective_measured, [m.to_tuple() for m in self.mcqs],
+                self.short_answer.to_tuple() if self.short_answer else None)
+
+
+@dataclass(slots=True)
+class Module:
+    """A run of ``size`` consecutive objectives/lessons/assessments in a hierarchical course."""
+    title: str
+    summary: str
+    size: int
+    review_notes: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Module":
+        return cls(data["title"], data.get("summary", ""), data["size"], data.get("review_notes", ""))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"title": self.title, "summary": self.summary, "size": self.size, "review_notes": self.review_notes}
+
+    @classmethod
+    def from_tuple(cls, values) -> "Module":
+        return cls(*values)
+
+    def to_tuple(self) -> tuple:
+        return (self.title, self.summary, self.size, self.review_notes)
@@ -0,0 +1,260 @@
+"""
+Tolerant parsing of agent output.
+
+Models wrap JSON in code fences, add prose before or after it, leave trailing
+commas, use smart quotes or get cut off mid-array. ``repair_json`` fixes the
+common cases and the ``parse_*`` helpers validate the result against the item
+schemas in ``config``.
+"""
+
+import ast
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from .config import AssessmentSchema, LessonSchema, ModuleSchema
+
+_FENCE = re.compile(r"```[a-zA-Z0-9_-]*\s*\n?")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"', "‘": "'", "’": "'"})
+# Closing quotes of a string a model opened with a typographic quote
+_SMART_CLOSERS = "”“"
+_OPENERS = {"[": "]", "{": "}"}
+
+
+class OutputParseError(ValueError):
+    """Raised when an agent's output cannot be turned into the expected structure."""
+
+
+def repair_json(text: str) -> str:
+    """Return the best-effort JSON document found in ``text``."""
+    text = text.strip().lstrip("﻿")
+    fence = _FENCE.search(text)
+    if fence:
+        # Keep what is inside the first fence; a missing closing fence means truncation.
+        text = text[fence.end():].split("```", 1)[0]
+
+    starts = [i for i in (text.find("["), text.find("{")) if i != -1]
+    if not starts:
+        return text.strip()
+    text = text[min(starts):]
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+    # Typographic quotes only delimit strings when used as delimiters; inside
+    # a string they are content ("He said “stop”", German „Hallo“).
+    smart_string = False
+    # Where to cut if the document turns out to be truncated: after the last
+    # complete item of the outermost array, with the stack at that point.
+    last_cut: Optional[Tuple[int, List[str]]] = None
+
+    for i, ch in enumerate(text):
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ((ch in _SMART_CLOSERS) if smart_string else (ch == '"')) and _closes_string(text, i + 1):
+                in_string = False
+                out[-1] = '"'
+            elif ch == '"':
+                out[-1] = '\\"'
+            elif ch == "\n":
+                out[-1] = "\\n"
+            continue
+        plain = ch.translate(_SMART_QUOTES)
+        smart_string = plain != ch
+        ch = plain
+        if ch == '"':
+            in_string = True
+        elif ch in _OPENERS:
+            stack.append(_OPENERS[ch])
+        elif ch in "]}":
+            if not stack:
+                break
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()  # trailing comma
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                # Trailing prose is dropped, a second document is an error.
+                if text[i + 1:].lstrip()[:1] in ("{", "[", ","):
+                    raise OutputParseError("output continues with more JSON after the first document")
+                return "".join(out)
+            if _in_item_list(stack):
+                last_cut = (len(out), list(stack))
+            continue
+        elif ch == "," and _in_item_list(stack):
+            last_cut = (len(out), list(stack))
+        out.append(ch)
+
+    # Truncated: keep the complete items of the outermost array and close
+    # what is open. An item cut off mid-object is dropped rather than closed,
+    # so it is regenerated instead of silently taking defaults; a document
+    # without complete items stays invalid.
+    if (in_string or stack) and last_cut is not None:
+        position, stack = last_cut
+        out = out[:position]
+        while out and (out[-1].isspace() or out[-1] == ","):
+            out.pop()
+        out.extend(reversed(stack))
+    return "".join(out)
+
+
+def _closes_string(text: str, position: int) -> bool:
+    # A quote ends a string only where JSON can continue after one, so stray
+    # quotes inside text ("He said “stop” now") stay content.
+    rest = text[position:].lstrip()
+    return not rest or rest[0] in ",:}]"
+
+
+def _in_item_list(stack: List[str]) -> bool:
+    # Directly inside the outermost array: a bare list of items, or the list
+    # in a {"lessons": [...]} wrapper.
+    return bool(stack) and stack[-1] == "]" and "]" not in stack[:-1]
+
+
+def parse_json(text: str) -> Any:
+    r"""
+    Parse agent output as JSON, repairing it when plain parsing fails.
+
+    >>> parse_json('Sure! ```json\n{"hook": "He said “stop” loudly", "seat_time": 60,}\n```')
+    {'hook': 'He said “stop” loudly', 'seat_time': 60}
+    >>> parse_json('{“a”: “He said “stop” now”}')
+    {'a': 'He said “stop” now'}
+    >>> parse_json('{"a": "x"} {"b": 1}')
+    Traceback (most recent call last):
+    ...
+    src.parsing.OutputParseError: output continues with more JSON after the first document
+    >>> parse_json('[{"title": "a", "seat_time": 75}, {"title": "b", "seat_ti')
+    [{'title': 'a', 'seat_time': 75}]
+    >>> parse_json('{"title": "b", "seat_ti')  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    src.parsing.OutputParseError: output is not valid JSON: ...
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    repaired = repair_json(text)
+    try:
+        return json.loads(repaired)
+    except json.JSONDecodeError as e:
+        # Some models answer with a Python literal (single quotes, True/None).
+        try:
+            return ast.literal_eval(repaired)
+        except (ValueError, SyntaxError):
+            raise OutputParseError(f"output is not valid JSON: {e}") from e
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'item'}: {err['msg']}" for err in error.errors()
+    )
+
+
+def validate_item(data: Any, schema: Type[BaseModel]) -> Dict[str, Any]:
+    if isinstance(data, list) and len(data) == 1:
+        data = data[0]
+    if not isinstance(data, dict):
+        raise OutputParseError(f"expected a JSON object, got {type(data).__name__}")
+    try:
+        return schema.model_validate(data).model_dump()
+    except ValidationError as e:
+        raise OutputParseError(_describe(e)) from e
+
+
+def validate_items(data: Any, schema: Type[BaseModel]) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, str]]:
+    """Validate each array item; invalid items come back as None with their error keyed by index."""
+    if isinstance(data, dict):
+        # {"lessons": [...]} style wrappers
+        values = list(data.values())
+        data = values[0] if len(values) == 1 and isinstance(values[0], list) else [data]
+    if not isinstance(data, list):
+        raise OutputParseError(f"expected a JSON array, got {type(data).__name__}")
+    items, errors = [], {}
+    for i, item in enumerate(data):
+        try:
+            items.append(validate_item(item, schema))
+        except OutputParseError as e:
+            items.append(None)
+            errors[i] = str(e)
+    return items, errors
+
+
+_LIST_ITEM = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s+(.+?)\s*$", re.MULTILINE)
+
+
+def parse_objectives(raw: str) -> List[str]:
+    try:
+        data = parse_json(raw)
+    except OutputParseError:
+        # A plain numbered or bulleted list is still usable.
+        data = _LIST_ITEM.findall(raw)
+    if isinstance(data, dict):
+        data = data.get("objectives", data.get("learning_objectives"))
+    if not isinstance(data, list):
+        raise OutputParseError("expected a JSON array of objective strings")
+    objectives = []
+    for item in data:
+        if isinstance(item, dict):
+            item = next((v for v in item.values() if isinstance(v, str)), "")
+        if str(item).strip():
+            objectives.append(str(item).strip())
+    if not objectives:
+        raise OutputParseError("no objectives found")
+    return objectives
+
+
+def parse_lesson(raw: str) -> Dict[str, Any]:
+    return validate_item(parse_json(raw), LessonSchema)
+
+
+def parse_lessons(raw: str):
+    return validate_items(parse_json(raw), LessonSchema)
+
+
+def parse_assessment(raw: str) -> Dict[str, Any]:
+    return validate_item(parse_json(raw), AssessmentSchema)
+
+
+def parse_assessments(raw: str):
+    return validate_items(parse_json(raw), AssessmentSchema)
+
+
+def parse_outline(raw: str) -> List[Dict[str, Any]]:
+    items, errors = validate_items(parse_json(raw), ModuleSchema)
+    if errors:
+        raise OutputParseError("; ".join(f"module {i + 1}: {error}" for i, error in errors.items()))
+    if not items:
+        raise OutputParseError("no modules found")
+    return items
+
+
+def parse_translation(raw: str, count: int) -> List[str]:
+    """The translations of a batch of ``count`` segments (keyed "1".."count"), in order."""
+    data = parse_json(raw)
+    if isinstance(data, dict) and isinstance(data.get("segments"), (dict, list)):
+        data = data["segments"]  # the input's wrapper echoed back
+    if isinstance(data, list):
+        data = {str(i): value for i, value in enumerate(data, 1)}
+    if not isinstance(data, dict):
+        raise OutputParseError(f"expected a JSON object of translations, got {type(data).__name__}")
+    keys = [str(i) for i in range(1, count + 1)]
+    missing = [key for key in keys if not isinstance(data.get(key), str) or not data[key].strip()]
+    if missing:
+        raise OutputParseError(f"{len(missing)} of {count} translations missing or empty (keys {', '.join(missing[:10])})")
+    return [data[key] for key in keys]
+
+
+def parse_review(raw: str) -> str:
+    text = raw.strip()
+    if not text:
+        raise OutputParseError("review is empty")
+    return text
@@ -0,0 +1,193 @@
+"""
+Per-agent model routing across OpenAI-compatible providers.
+
+Providers come from the environment (see .env.example):
+
+- ``moonshot``: ``MOONSHOT_API_KEY``, ``MOONSHOT_MODEL``, ``MOONSHOT_BASE_URL``
+- ``deepseek``: ``DEEPSEEK_API_KEY``, ``DEEPSEEK_MODEL``, ``DEEPSEEK_BASE_URL``
+- ``default``: the original single-model setup, ``LLM_MODEL`` with the
+  DeepSeek key and base URL
+
+Each provider can also set ``<PROVIDER>_FAST_MODEL``. The objective,
+review and translation agents use the fast model and the lesson and
+assessment agents the full one. ``LLM_ROUTE_<ROLE>=deepseek,moonshot:kimi-latest`` pins a role to
+specific providers and models. Every provider keeps one keep-alive HTTP pool
+and a rolling latency window. Calls go to the fastest healthy provider first
+and fail over to the next one on errors.
+"""
+
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from .context import current_usage, record_usage
+
+PROVIDER_DEFAULTS = {
+    "moonshot": ("MOONSHOT", "https://api.moonshot.ai/v1"),
+    "deepseek": ("DEEPSEEK", "https://api.deepseek.com/v1"),
+}
+ROLE_TIERS = {"objective": "fast", "review": "fast", "lesson": "strong", "assessment": "strong",
+              "translation": "fast"}
+
+LATENCY_WINDOW = 50
+# A provider that fails this many times in a row sits out for the cooldown.
+MAX_CONSECUTIVE_FAILURES = 3
+COOLDOWN_SECONDS = 30.0
+
+
+def _model_name(model: str) -> str:
+    # Bare model names are served through litellm's OpenAI-compatible client.
+    return model if "/" in model else f"openai/{model}"
+
+
+class Provider:
+    def __init__(self, name: str, api_key: Optional[str], base_url: str, model: str,
+                 fast_model: Optional[str] = None):
+        self.name = name
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = _model_name(model)
+        self.fast_model = _model_name(fast_model) if fast_model else self.model
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._failures = 0
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self._client = None
+
+    def model_for(self, role: Optional[str]) -> str:
+        return self.fast_model if ROLE_TIERS.get(role) == "fast" else self.model
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Rolling median latency in seconds, None until the first call."""
+        with self._lock:
+            return statistics.median(self._latencies) if self._latencies else None
+
+    def record_success(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= MAX_CONSECUTIVE_FAILURES:
+                self._down_until = time.monotonic() + COOLDOWN_SECONDS
+                self._failures = 0
+
+    def client(self):
+        """Shared OpenAI client over a keep-alive connection pool, or None with LLM_POOL=0."""
+        if os.getenv("LLM_POOL", "1").lower() in ("0", "false", "no", "off"):
+            return None
+        with self._lock:
+            if self._client is None:
+                import httpx
+                import openai
+
+                limits = httpx.Limits(
+                    max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20")),
+                    max_keepalive_connections=int(os.getenv("LLM_POOL_KEEPALIVE", "10")),
+                    keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60")),
+                )
+                self._client = openai.OpenAI(
+                    api_key=self.api_key or "none",
+                    base_url=self.base_url,
+                    http_client=httpx.Client(limits=limits, timeout=httpx.Timeout(120.0, connect=10.0),
+                                             event_hooks={"response": [_capture_usage]}),
+                    max_retries=0,
+                )
+            return self._client
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"provider": self.name, "healthy": self.healthy, "latency_s": self.latency,
+                "calls": len(self._latencies)}
+
+
+def _capture_usage(response) -> None:
+    # Runs on the calling thread, so the usage lands in the CachedLLM call
+    # that made the request. Streamed (non-JSON) bodies are left alone.
+    if current_usage.get() is None or "json" not in response.headers.get("content-type", ""):
+        return
+    response.read()
+    try:
+        body = response.json()
+    except ValueError:
+        return
+    if isinstance(body, dict) and isinstance(body.get("usage"), dict):
+        record_usage(body["usage"])
+
+
+def _providers_from_env() -> Dict[str, Provider]:
+    providers = {}
+    for name, (prefix, default_url) in PROVIDER_DEFAULTS.items():
+        model = os.getenv(f"{prefix}_MODEL")
+        if model and os.getenv(f"{prefix}_API_KEY"):
+            providers[name] = Provider(
+                name, os.getenv(f"{prefix}_API_KEY"), os.getenv(f"{prefix}_BASE_URL") or default_url,
+                model, os.getenv(f"{prefix}_FAST_MODEL"),
+            )
+    if os.getenv("LLM_MODEL"):
+        providers["default"] = Provider(
+            "default", os.getenv("DEEPSEEK_API_KEY"),
+            os.getenv("DEEPSEEK_BASE_URL", "https://api.openai.com/v1"),
+            os.environ["LLM_MODEL"], os.getenv("LLM_FAST_MODEL"),
+        )
+    return providers
+
+
+class Router:
+    def __init__(self, providers: Dict[str, Provider]):
+        self.providers = providers
+
+    def routes(self, role: Optional[str]) -> List[Tuple[Provider, str]]:
+        """Configured (provider, model) candidates for ``role`` in preference order."""
+        spec = os.getenv(f"LLM_ROUTE_{(role or '').upper()}", "")
+        if not spec:
+            return self._unique([(p, p.model_for(role)) for p in self.providers.values()])
+        routes = []
+        for entry in spec.split(","):
+            name, _, model = entry.strip().partition(":")
+            if name not in self.providers:
+                raise KeyError(f"LLM_ROUTE_{role.upper()} names unknown provider {name!r}")
+            provider = self.providers[name]
+            routes.append((provider, _model_name(model) if model else provider.model_for(role)))
+        return self._unique(routes)
+
+    @staticmethod
+    def _unique(routes: List[Tuple[Provider, str]]) -> List[Tuple[Provider, str]]:
+        # The same endpoint, model and key twice (e.g. LLM_MODEL set to the
+        # DeepSeek model, which reuses its key and URL) would only repeat a
+        # failed call, so keep the first.
+        seen = set()
+        unique = []
+        for provider, model in routes:
+            key = (provider.base_url.rstrip("/"), model, provider.api_key)
+            if key not in seen:
+                seen.add(key)
+                unique.append((provider, model))
+        return unique
+
+    @staticmethod
+    def order(candidates: List[Any], provider_of=lambda c: c) -> List[Any]:
+        """Healthy before cooling-down, then fastest rolling latency; untried providers go first."""
+        def rank(item):
+            provider = provider_of(item)
+            latency = provider.latency
+            return (not provider.healthy, latency is not None, latency or 0.0)
+        return sorted(candidates, key=rank)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [p.snapshot() for p in self.providers.values()]
+
+
+@lru_cache
+def get_router() -> Router:
+    return Router(_providers_from_env())
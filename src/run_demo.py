@@ -1,4 +1,3 @@
-import json
 import sys
 import os
 from dotenv import load_dotenv
@@ -9,6 +8,7 @@ sys.path.insert(0, project_root)
 load_dotenv(os.path.join(project_root, '.env'))
 
 from src.crew import CurriculumCrew
+from src.export import write_export
 
 def main():
     crew = CurriculumCrew()
@@ -17,9 +17,10 @@ def main():
         target_audience="Non-technical managers in fintech startups"
     )
     
-    print(result.package_md)
-    with open("syllabus.json", "w") as f:
-        json.dump(result.package_json, f, indent=2)
+    sys.stdout.flush()
+    write_export(result, "md", sys.stdout.buffer)
+    sys.stdout.buffer.flush()
+    write_export(result, "json", "syllabus.json")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,320 @@
+"""
+Shared scheduler between the agents and their LLM providers.
+
+Every uncached LLM call goes through a lane, one per (provider, model),
+before it reaches the network. Each lane has four parts:
+
+- token buckets for requests/min and tokens/min (``<PREFIX>_RPM`` and
+  ``<PREFIX>_TPM``, where the prefix is ``MOONSHOT``, ``DEEPSEEK`` or ``LLM``)
+- an AIMD concurrency limit. It grows by one slot per window of clean calls,
+  halves on a 429 and shrinks when latency passes ``LLM_LATENCY_TARGET``.
+- priority admission: waiting callers are served lowest priority value
+  first (see ``PRIORITIES``), so interactive jobs overtake batch runs
+- retries of 429s, 5xx responses and timeouts with full-jitter backoff. A
+  ``Retry-After`` header pauses the whole lane for that long.
+
+The priority is carried by a context variable. The job service and batch
+runs set it with ``priority_scope``, and the crew's pool threads inherit it.
+"""
+
+import email.utils
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .cancellation import check_cancelled
+
+PRIORITIES = {"interactive": 0, "normal": 5, "batch": 10}
+
+RETRYABLE_STATUS = (408, 409, 429, 500, 502, 503, 504, 529)
+# Waiters wake up at least this often to notice cancellation.
+POLL_SECONDS = 0.25
+
+
+def priority_value(priority: Union[int, str, None]) -> int:
+    """Lower runs first; accepts a name from PRIORITIES or an int."""
+    if priority is None:
+        return PRIORITIES["normal"]
+    if isinstance(priority, str) and not priority.lstrip("-").isdigit():
+        if priority not in PRIORITIES:
+            raise ValueError(f"unknown priority {priority!r}, expected one of {', '.join(PRIORITIES)} or an int")
+        return PRIORITIES[priority]
+    return int(priority)
+
+
+current_priority: ContextVar[int] = ContextVar("current_priority", default=PRIORITIES["normal"])
+
+
+@contextmanager
+def priority_scope(priority: Union[int, str, None]):
+    token = current_priority.set(priority_value(priority))
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name, "")
+    return float(value) if value.strip() else default
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units evenly over a minute, holding at most a minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available (requests larger than capacity wait for a full bucket)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        # May go negative; later callers then wait for the debt to refill.
+        self.level -= amount
+
+
+class Lane:
+    """Admission control for one (provider, model) pair. Callers hold ``_cond`` for all state."""
+
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0, max_concurrency: int = 16,
+                 initial_concurrency: int = 4, latency_target: float = 0.0):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(min(initial_concurrency, self.max_concurrency))
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.counters = {"calls": 0, "throttled": 0, "retries": 0, "slow": 0, "waited_s": 0.0}
+        self._waiters: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens: int, priority: int) -> float:
+        """Block until this caller may send a request of ``tokens``; returns the seconds waited."""
+        started = time.monotonic()
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._admission_delay(ticket, tokens, now)
+                    if delay == 0.0:
+                        heapq.heappop(self._waiters)
+                        self.in_flight += 1
+                        if self.requests:
+                            self.requests.take(1)
+                        if self.tokens:
+                            self.tokens.take(tokens)
+                        waited = now - started
+                        self.counters["waited_s"] += waited
+                        self._cond.notify_all()
+                        return waited
+                    self._cond.wait(min(delay, POLL_SECONDS))
+                    check_cancelled()
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def _admission_delay(self, ticket: Tuple[int, int], tokens: int, now: float) -> float:
+        if self._waiters[0] != ticket or self.in_flight >= int(self.limit):
+            return POLL_SECONDS
+        delay = self.paused_until - now
+        if self.requests:
+            delay = max(delay, self.requests.wait_time(1, now))
+        if self.tokens:
+            delay = max(delay, self.tokens.wait_time(tokens, now))
+        return max(0.0, delay)
+
+    def release(self, seconds: Optional[float] = None, throttled: bool = False,
+                retry_after: Optional[float] = None, token_correction: int = 0) -> None:
+        """
+        Return a slot and adapt the limit: halve it on a 429, shrink it on a
+        latency above target, and otherwise grow it by about one slot per
+        ``limit`` clean calls.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self.counters["calls"] += 1
+            if self.tokens and token_correction:
+                self.tokens.take(token_correction)
+            if throttled:
+                self.counters["throttled"] += 1
+                self.limit = max(1.0, self.limit / 2)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            elif seconds is not None and self.latency_target and seconds > self.latency_target:
+                self.counters["slow"] += 1
+                self.limit = max(1.0, self.limit * 0.9)
+            elif seconds is not None:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def count(self, key: str, amount: float = 1) -> None:
+        with self._cond:
+            self.counters[key] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"lane": self.name, "limit": round(self.limit, 2), "in_flight": self.in_flight,
+                    "waiting": len(self._waiters), **{k: round(v, 3) for k, v in self.counters.items()}}
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a litellm/openai/httpx error, if it carries one."""
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from a ``Retry-After``/``retry-after-ms`` header on the error's response."""
+    headers = (getattr(getattr(error, "response", None), "headers", None)
+               or getattr(error, "litellm_response_headers", None) or getattr(error, "headers", None))
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retryable(error: BaseException) -> bool:
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    return isinstance(error, (TimeoutError, ConnectionError)) or "Timeout" in type(error).__name__
+
+
+class Scheduler:
+    def __init__(self, max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 lane_factory: Optional[Callable[[str, str], Lane]] = None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lane_factory = lane_factory or _lane_from_env
+        self._lanes: Dict[Tuple[str, str], Lane] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Scheduler":
+        return cls(
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+            backoff_base=_env_float("LLM_BACKOFF_BASE", 0.5),
+            backoff_max=_env_float("LLM_BACKOFF_MAX", 30.0),
+        )
+
+    def lane(self, provider: Optional[str], model: str) -> Lane:
+        key = (provider or "default", model)
+        with self._lock:
+            if key not in self._lanes:
+                self._lanes[key] = self._lane_factory(*key)
+            return self._lanes[key]
+
+    def call(self, provider: Optional[str], model: str, tokens: int, fn: Callable[[], Any],
+             priority: Optional[int] = None, count_tokens: Callable[[Any], int] = None,
+             on_wait: Callable[[float, int], None] = None) -> Any:
+        """
+        Run ``fn`` (one provider request of about ``tokens`` tokens) inside
+        ``provider``/``model``'s lane, retrying retryable errors. ``count_tokens``
+        maps the response to its real token count so the tokens/min bucket is
+        corrected after the fact; ``on_wait(seconds, retries)`` reports the time
+        spent queued and retrying.
+        """
+        lane = self.lane(provider, model)
+        priority = current_priority.get() if priority is None else priority
+        waited, attempt = 0.0, 0
+        while True:
+            waited += lane.acquire(tokens, priority)
+            started = time.monotonic()
+            try:
+                response = fn()
+            except Exception as e:
+                throttled = status_code(e) == 429
+                delay_hint = retry_after(e)
+                lane.release(throttled=throttled, retry_after=delay_hint)
+                if attempt >= self.max_retries or not _retryable(e):
+                    if on_wait:
+                        on_wait(waited, attempt)
+                    raise
+                attempt += 1
+                lane.count("retries")
+                # Full jitter, but never sooner than the provider asked for
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                delay = max(delay, min(delay_hint or 0.0, self.backoff_max))
+                print(f"⏳ {lane.name}: {status_code(e) or type(e).__name__}, retry {attempt} in {delay:.1f}s")
+                waited += delay
+                _sleep(delay)
+                continue
+            used = count_tokens(response) if count_tokens else 0
+            lane.release(time.monotonic() - started, token_correction=used - tokens if used else 0)
+            if on_wait:
+                on_wait(waited, attempt)
+            return response
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            lanes = list(self._lanes.values())
+        return [lane.snapshot() for lane in lanes]
+
+
+def _sleep(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while True:
+        check_cancelled()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, POLL_SECONDS))
+
+
+def _lane_from_env(provider: str, model: str) -> Lane:
+    prefix = "LLM" if provider == "default" else provider.upper()
+    return Lane(
+        f"{provider}/{model}",
+        rpm=_env_float(f"{prefix}_RPM", _env_float("LLM_RPM", 0)),
+        tpm=_env_float(f"{prefix}_TPM", _env_float("LLM_TPM", 0)),
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+        initial_concurrency=int(os.getenv("LLM_INITIAL_CONCURRENCY", "4")),
+        latency_target=_env_float("LLM_LATENCY_TARGET", 0.0),
+    )
+
+
+def scheduler_enabled() -> bool:
+    return os.getenv("LLM_SCHEDULER", "1").lower() not in ("0", "false", "no", "off")
+
+
+@lru_cache
+def get_scheduler() -> Scheduler:
+    return Scheduler.from_env()
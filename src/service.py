@@ -0,0 +1,460 @@
+"""
+Local HTTP job service around ``CurriculumCrew.generate_curriculum``.
+
+Requests are queued by priority and run on a bounded worker pool. A request
+identical to one that is already queued or running joins that job instead
+of starting a second generation:
+
+    python -m src.service --port 8765 --workers 4
+
+    POST /jobs                 {"course_idea", "target_audience", "priority"} -> 202 job;
+                               "fresh": true regenerates instead of reusing past results
+    GET  /jobs/<id>?since=N    status plus progress events from N on
+    GET  /jobs/<id>/result     CurriculumOutput as JSON (409 until done);
+                               ?format=md|json|ndjson|html streams an export
+    GET  /similar?course_idea=&target_audience=   stored near-duplicates
+    GET  /curricula/<id>       a stored CurriculumOutput
+    DELETE /jobs/<id>          cancel (once every coalesced requester has cancelled)
+    GET  /stats                queue depth, workers, coalesced requests, LLM lanes
+
+``ServiceClient`` is the matching Python client used by the Streamlit app.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from urllib import error as urlerror, request as urlrequest
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from .scheduler import get_scheduler, priority_scope, priority_value
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+def request_key(course_idea: str, target_audience: str) -> Tuple[str, str]:
+    return (" ".join(course_idea.split()), " ".join(target_audience.split()))
+
+
+@dataclass
+class Job:
+    id: str
+    course_idea: str
+    target_audience: str
+    priority: int
+    status: str = QUEUED
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    coalesced: int = 0
+    error: Optional[str] = None
+    result: Any = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    # Requesters sharing this job; it is only cancelled once all of them cancel.
+    subscribers: Set[str] = field(default_factory=set)
+    # Skip the curriculum store and response cache and generate anew
+    fresh: bool = False
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self, since: int = 0) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "course_idea": self.course_idea,
+            "target_audience": self.target_audience,
+            "priority": self.priority,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "coalesced": self.coalesced,
+            "fresh": self.fresh,
+            "error": self.error,
+            "events": self.events[since:],
+            "next_event": len(self.events),
+        }
+
+
+class JobService:
+    def __init__(self, workers: int = None, mode: str = None, max_jobs: int = 1000):
+        self.workers = workers or int(os.getenv("SERVICE_WORKERS", "4"))
+        self.mode = mode
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], str] = {}
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self.coalesced = 0
+
+    def start(self) -> "JobService":
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"curriculum-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, course_idea: str, target_audience: str, priority: Union[int, str, None] = None,
+               requester: Optional[str] = None, fresh: bool = False) -> Tuple[Job, bool]:
+        """
+        Queue a generation, or join the identical one in flight. Returns (job,
+        coalesced). ``requester`` identifies the caller for ``cancel``; an
+        anonymous submission gets a requester of its own. A ``fresh`` request
+        bypasses stored and cached results and only joins another fresh job.
+        """
+        rank = priority_value(priority)
+        key = request_key(course_idea, target_audience)
+        requester = requester or uuid.uuid4().hex
+        with self._lock:
+            job = self.jobs.get(self._inflight.get(key, ""))
+            # A job being cancelled is never joined; the request starts afresh.
+            if job is not None and not job.cancel_event.is_set() and (job.fresh or not fresh):
+                if requester not in job.subscribers:
+                    job.coalesced += 1
+                    self.coalesced += 1
+                job.subscribers.add(requester)
+                if job.status == QUEUED and rank < job.priority:
+                    # Re-queue at the higher priority; the old entry is skipped.
+                    job.priority = rank
+                    self._queue.put((rank, next(self._seq), job.id))
+                return job, True
+            job = Job(uuid.uuid4().hex[:12], key[0], key[1], rank, subscribers={requester}, fresh=fresh)
+            self.jobs[job.id] = job
+            self._inflight[key] = job.id
+            self._evict()
+        self._queue.put((rank, next(self._seq), job.id))
+        return job, False
+
+    def cancel(self, job_id: str, requester: Optional[str] = None) -> Optional[Job]:
+        """
+        Drop ``requester``'s interest (repeating it is a no-op), or everyone's
+        when no requester is given. Once nobody is left, a queued job is
+        cancelled at once and a running one at its next LLM call; either way
+        new identical requests start a fresh job from then on.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in FINISHED or job.cancel_event.is_set():
+                return job
+            if requester is None:
+                job.subscribers.clear()
+            else:
+                job.subscribers.discard(requester)
+            if job.subscribers:
+                return job
+            job.cancel_event.set()
+            self._release(job)
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished = time.time()
+        return job
+
+    def _release(self, job: Job) -> None:
+        # Caller holds _lock. The key may already belong to a newer job.
+        key = request_key(job.course_idea, job.target_audience)
+        if self._inflight.get(key) == job.id:
+            del self._inflight[key]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            stats = {"workers": self.workers, "jobs": counts, "in_flight": len(self._inflight),
+                     "coalesced": self.coalesced}
+        return {**stats, "llm_lanes": get_scheduler().stats()}
+
+    def _evict(self) -> None:
+        # Forget the oldest finished jobs once over capacity.
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id].status in FINISHED:
+                del self.jobs[job_id]
+
+    def _work(self) -> None:
+        from .cache import refresh_scope
+        from .cancellation import Cancelled, cancel_scope
+        from .crew import CurriculumCrew
+
+        while True:
+            rank, _, job_id = self._queue.get()
+            with self._lock:
+                job = self.jobs.get(job_id)
+                if job is None or job.status != QUEUED or rank != job.priority:
+                    continue
+                job.status = RUNNING
+                job.started = time.time()
+            try:
+                # The job's priority also orders its LLM calls against other jobs'
+                with cancel_scope(job.cancel_event), priority_scope(job.priority), refresh_scope(job.fresh):
+                    result = CurriculumCrew(mode=self.mode).generate_curriculum(
+                        job.course_idea, job.target_audience, on_event=lambda event: self._record(job, event),
+                        reuse="off" if job.fresh else None,
+                    )
+            except Cancelled:
+                print(f"🛑 Job {job.id} cancelled")
+                outcome = {"status": CANCELLED}
+            except Exception as e:
+                print(f"❌ Job {job.id} failed: {type(e).__name__}: {e}")
+                outcome = {"status": FAILED, "error": f"{type(e).__name__}: {e}"}
+            else:
+                outcome = {"status": DONE, "result": result}
+            with self._lock:
+                for name, value in outcome.items():
+                    setattr(job, name, value)
+                job.finished = time.time()
+                self._release(job)
+
+    @staticmethod
+    def _record(job: Job, event) -> None:
+        # Raw agent text stays server-side; clients get the parsed data.
+        job.events.append({"kind": event.kind, "stage": event.stage, "index": event.index, "data": event.data,
+                           "module": event.module})
+
+    def serve(self, port: int = 8765, host: str = "127.0.0.1") -> str:
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _json(self, status: int, body: Any) -> None:
+                payload = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/jobs":
+                    self.send_error(404)
+                    return
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                    requester = body.get("requester") or uuid.uuid4().hex
+                    job, coalesced = service.submit(
+                        body["course_idea"], body["target_audience"], body.get("priority"), requester,
+                        bool(body.get("fresh")),
+                    )
+                except (KeyError, ValueError, TypeError) as e:
+                    self._json(400, {"error": f"{type(e).__name__}: {e}"})
+                    return
+                self._json(202, {**job.to_dict(), "coalesced_request": coalesced, "requester": requester})
+
+            def do_DELETE(self):
+                url = urlparse(self.path)
+                parts = [p for p in url.path.split("/") if p]
+                requester = parse_qs(url.query).get("requester", [None])[0]
+                job = service.cancel(parts[1], requester) if len(parts) == 2 and parts[0] == "jobs" else None
+                if job is None:
+                    self.send_error(404)
+                    return
+                self._json(200, job.to_dict(len(job.events)))
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = [p for p in url.path.split("/") if p]
+                if parts == ["stats"]:
+                    self._json(200, service.stats())
+                    return
+                if parts == ["similar"] or (len(parts) == 2 and parts[0] == "curricula"):
+                    self._stored(parts, query)
+                    return
+                job = service.get(parts[1]) if len(parts) >= 2 and parts[0] == "jobs" else None
+                if job is None:
+                    self.send_error(404)
+                    return
+                if len(parts) == 2:
+                    self._json(200, job.to_dict(int(query.get("since", ["0"])[0])))
+                elif parts[2:] == ["result"]:
+                    self._result(job, query.get("format", [None])[0])
+                else:
+                    self.send_error(404)
+
+            def _stored(self, parts: List[str], query: Dict[str, List[str]]) -> None:
+                from .store import get_curriculum_store, store_enabled
+
+                if not store_enabled():
+                    self._json(404, {"error": "the curriculum store is disabled"})
+                    return
+                store = get_curriculum_store()
+                if parts[0] == "similar":
+                    self._json(200, store.find_similar(
+                        query.get("course_idea", [""])[0], query.get("target_audience", [""])[0],
+                        limit=int(query.get("limit", ["5"])[0]),
+                        min_score=float(query.get("min_score", ["0.3"])[0]),
+                    ))
+                    return
+                curriculum = store.load(int(parts[1])) if parts[1].isdigit() else None
+                if curriculum is None:
+                    self._json(404, {"error": f"no stored curriculum {parts[1]}"})
+                    return
+                self._json(200, curriculum.model_dump())
+
+            def _result(self, job: Job, fmt: Optional[str]) -> None:
+                if job.status == FAILED:
+                    self._json(500, {"error": job.error})
+                    return
+                if job.status == CANCELLED:
+                    self._json(410, {"status": job.status, "error": "job was cancelled"})
+                    return
+                if job.status != DONE:
+                    self._json(409, {"status": job.status})
+                    return
+                if fmt is None:
+                    self._json(200, job.result.model_dump())
+                    return
+                from .export import MIME_TYPES, write_export
+
+                if fmt not in MIME_TYPES:
+                    self._json(400, {"error": f"unknown format {fmt!r}"})
+                    return
+                # Exports are streamed straight to the socket, without Content-Length.
+                self.send_response(200)
+                self.send_header("Content-Type", f"{MIME_TYPES[fmt]}; charset=utf-8")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                write_export(job.result, fmt, self.wfile)
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._httpd.serve_forever, name="curriculum-service", daemon=True).start()
+        return f"http://{host}:{self._httpd.server_address[1]}"
+
+    def shutdown(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+
+class ServiceError(RuntimeError):
+    pass
+
+
+class ServiceClient:
+    def __init__(self, base_url: str, timeout: float = 30.0, requester: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # Default identity for submit/cancel; callers sharing one client (the
+        # Streamlit sessions) pass their own.
+        self.requester = requester or uuid.uuid4().hex
+
+    def _request(self, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urlrequest.Request(f"{self.base_url}{path}", data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+        try:
+            with urlrequest.urlopen(req, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read() or b"null")
+        except urlerror.HTTPError as e:
+            payload = e.read()
+            try:
+                return e.code, json.loads(payload or b"null")
+            except json.JSONDecodeError:
+                raise ServiceError(f"{method} {path} failed with HTTP {e.code}") from e
+
+    def submit(self, course_idea: str, target_audience: str, priority: Union[int, str] = "interactive",
+               requester: Optional[str] = None, fresh: bool = False) -> Dict[str, Any]:
+        status, body = self._request("POST", "/jobs", {
+            "course_idea": course_idea, "target_audience": target_audience, "priority": priority,
+            "requester": requester or self.requester, "fresh": fresh,
+        })
+        if status != 202:
+            raise ServiceError(body.get("error", f"submit failed with HTTP {status}"))
+        return body
+
+    def status(self, job_id: str, since: int = 0) -> Dict[str, Any]:
+        status, body = self._request("GET", f"/jobs/{job_id}?since={since}")
+        if status != 200:
+            raise ServiceError(f"unknown job {job_id}")
+        return body
+
+    def result(self, job_id: str):
+        from .config import CurriculumOutput
+
+        status, body = self._request("GET", f"/jobs/{job_id}/result")
+        if status == 200:
+            return CurriculumOutput(**body)
+        raise ServiceError((body or {}).get("error") or f"job {job_id} is {(body or {}).get('status')}")
+
+    def cancel(self, job_id: str, requester: Optional[str] = None) -> Dict[str, Any]:
+        query = urlencode({"requester": requester or self.requester})
+        status, body = self._request("DELETE", f"/jobs/{job_id}?{query}")
+        if status != 200:
+            raise ServiceError(f"unknown job {job_id}")
+        return body
+
+    def similar(self, course_idea: str, target_audience: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Stored past curricula close to this request; empty when the store is disabled."""
+        query = urlencode({"course_idea": course_idea, "target_audience": target_audience, "limit": limit})
+        status, body = self._request("GET", f"/similar?{query}")
+        return body if status == 200 else []
+
+    def stored(self, curriculum_id: int):
+        from .config import CurriculumOutput
+
+        status, body = self._request("GET", f"/curricula/{curriculum_id}")
+        if status != 200:
+            raise ServiceError((body or {}).get("error") or f"no stored curriculum {curriculum_id}")
+        return CurriculumOutput(**body)
+
+    def generate(self, course_idea: str, target_audience: str, on_event=None,
+                 priority: Union[int, str] = "interactive", poll_seconds: float = 0.5):
+        """Submit and wait, passing progress events (as CrewEvent) to ``on_event``."""
+        from .events import CrewEvent
+
+        job = self.submit(course_idea, target_audience, priority)
+        since = 0
+        while True:
+            state = self.status(job["id"], since)
+            since = state["next_event"]
+            for event in state["events"]:
+                if on_event:
+                    on_event(CrewEvent(**event))
+            if state["status"] in FINISHED:
+                return self.result(job["id"])
+            time.sleep(poll_seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve curriculum generation as an HTTP job queue.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mode", choices=["sequential", "fanout", "hierarchical"], default=None)
+    args = parser.parse_args(argv)
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(project_root, ".env"))
+
+    service = JobService(args.workers, args.mode).start()
+    url = service.serve(args.port, args.host)
+    print(f"🛰️ Curriculum service on {url} with {service.workers} workers")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
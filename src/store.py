@@ -0,0 +1,206 @@
+"""
+Persistent, searchable store of generated curricula.
+
+Every finished ``CurriculumOutput`` is saved to SQLite together with its
+objectives, lessons and assessment items. ``course_idea``/``target_audience``
+and the lesson text are indexed with FTS5. Before a new generation starts,
+``find_similar`` returns exact and near-duplicate past requests, so a
+rephrased course can be served from the store in milliseconds instead of
+being generated again (see ``CURRICULUM_REUSE`` in ``CurriculumCrew``).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "crewai-curriculum", "curricula.sqlite3")
+
+_STOPWORDS = frozenset("a an and the for of to in on with into from by at about course intro introduction".split())
+
+
+def _tokens(text: str) -> set:
+    return {t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in _STOPWORDS}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def similarity(course_idea: str, target_audience: str, other_idea: str, other_audience: str) -> float:
+    """Token overlap of two requests in [0, 1]; the course idea weighs more than the audience."""
+    return (0.7 * _jaccard(_tokens(course_idea), _tokens(other_idea))
+            + 0.3 * _jaccard(_tokens(target_audience), _tokens(other_audience)))
+
+
+def _normalized(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class CurriculumStore:
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS curricula (
+                id INTEGER PRIMARY KEY,
+                course_idea TEXT NOT NULL,
+                target_audience TEXT NOT NULL,
+                request_key TEXT NOT NULL,
+                created REAL NOT NULL,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS curricula_request_key ON curricula(request_key);
+            CREATE TABLE IF NOT EXISTS objectives (
+                curriculum_id INTEGER NOT NULL REFERENCES curricula(id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lessons (
+                id INTEGER PRIMARY KEY,
+                curriculum_id INTEGER NOT NULL REFERENCES curricula(id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                body TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS assessment_items (
+                curriculum_id INTEGER NOT NULL REFERENCES curricula(id) ON DELETE CASCADE,
+                lesson_position INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                question TEXT NOT NULL,
+                body TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS curricula_fts USING fts5(course_idea, target_audience);
+            CREATE VIRTUAL TABLE IF NOT EXISTS lessons_fts USING fts5(title, text);
+            """
+        )
+
+    @classmethod
+    def from_env(cls) -> "CurriculumStore":
+        return cls(os.getenv("CURRICULUM_STORE_PATH", DEFAULT_STORE_PATH))
+
+    def save(self, curriculum) -> int:
+        course_idea = curriculum.course_idea
+        target_audience = curriculum.target_audience
+        payload = curriculum.to_bytes().decode("utf-8")
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                curriculum_id = self._conn.execute(
+                    "INSERT INTO curricula (course_idea, target_audience, request_key, created, payload)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (course_idea, target_audience, self._request_key(course_idea, target_audience),
+                     time.time(), payload),
+                ).lastrowid
+                self._conn.execute(
+                    "INSERT INTO curricula_fts (rowid, course_idea, target_audience) VALUES (?, ?, ?)",
+                    (curriculum_id, course_idea, target_audience),
+                )
+                self._conn.executemany(
+                    "INSERT INTO objectives (curriculum_id, position, text) VALUES (?, ?, ?)",
+                    [(curriculum_id, i, text) for i, text in enumerate(curriculum.learning_objectives)],
+                )
+                for i, lesson in enumerate(curriculum.lesson_blueprints):
+                    lesson_row = self._conn.execute(
+                        "INSERT INTO lessons (curriculum_id, position, title, body) VALUES (?, ?, ?, ?)",
+                        (curriculum_id, i, lesson.title, json.dumps(lesson.to_dict(), ensure_ascii=False)),
+                    ).lastrowid
+                    text = " ".join((lesson.hook, lesson.explain, lesson.practice, lesson.reflect))
+                    self._conn.execute(
+                        "INSERT INTO lessons_fts (rowid, title, text) VALUES (?, ?, ?)",
+                        (lesson_row, lesson.title, text),
+                    )
+                items = []
+                for i, assessment in enumerate(curriculum.assessments):
+                    for mcq in assessment.mcqs:
+                        items.append((curriculum_id, i, "mcq", mcq.question,
+                                      json.dumps(mcq.to_dict(), ensure_ascii=False)))
+                    short_answer = assessment.short_answer
+                    if short_answer:
+                        items.append((curriculum_id, i, "short_answer", short_answer.question,
+                                      json.dumps(short_answer.to_dict(), ensure_ascii=False)))
+                self._conn.executemany(
+                    "INSERT INTO assessment_items (curriculum_id, lesson_position, kind, question, body)"
+                    " VALUES (?, ?, ?, ?, ?)", items,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return curriculum_id
+
+    def load(self, curriculum_id: int):
+        from .config import CurriculumOutput
+
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM curricula WHERE id = ?", (curriculum_id,)).fetchone()
+        if not row:
+            return None
+        # Rows saved before the compact encoding hold a model_dump_json object
+        if row[0].startswith("{"):
+            return CurriculumOutput.model_validate_json(row[0])
+        return CurriculumOutput.from_bytes(row[0].encode("utf-8"))
+
+    def find_similar(self, course_idea: str, target_audience: str, limit: int = 5,
+                     min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Past requests ranked by similarity, newest first among equals. Exact
+        matches (ignoring case and whitespace) score 1.0.
+        """
+        key = self._request_key(course_idea, target_audience)
+        terms = _tokens(f"{course_idea} {target_audience}")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, course_idea, target_audience, created FROM curricula WHERE request_key = ?", (key,)
+            ).fetchall()
+            if terms:
+                query = " OR ".join(f'"{t}"' for t in sorted(terms))
+                rows += self._conn.execute(
+                    "SELECT c.id, c.course_idea, c.target_audience, c.created FROM curricula_fts f"
+                    " JOIN curricula c ON c.id = f.rowid WHERE curricula_fts MATCH ?"
+                    " ORDER BY bm25(curricula_fts) LIMIT ?", (query, max(limit * 4, 20)),
+                ).fetchall()
+        matches = {}
+        for curriculum_id, idea, audience, created in rows:
+            exact = self._request_key(idea, audience) == key
+            score = 1.0 if exact else similarity(course_idea, target_audience, idea, audience)
+            if score >= min_score:
+                matches[curriculum_id] = {"id": curriculum_id, "course_idea": idea, "target_audience": audience,
+                                          "created": created, "score": round(score, 4), "exact": exact}
+        return sorted(matches.values(), key=lambda m: (-m["score"], -m["created"]))[:limit]
+
+    def search_lessons(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Full-text search over stored lesson titles and bodies."""
+        terms = _tokens(text)
+        if not terms:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT l.curriculum_id, l.position, l.body FROM lessons_fts f JOIN lessons l ON l.id = f.rowid"
+                " WHERE lessons_fts MATCH ? ORDER BY bm25(lessons_fts) LIMIT ?",
+                (" OR ".join(f'"{t}"' for t in sorted(terms)), limit),
+            ).fetchall()
+        return [{"curriculum_id": cid, "position": pos, **json.loads(body)} for cid, pos, body in rows]
+
+    @staticmethod
+    def _request_key(course_idea: str, target_audience: str) -> str:
+        return f"{_normalized(course_idea)}\x1f{_normalized(target_audience)}"
+
+
+def store_enabled() -> bool:
+    return os.getenv("CURRICULUM_STORE", "1").lower() not in ("0", "false", "no", "off")
+
+
+@lru_cache
+def get_curriculum_store() -> CurriculumStore:
+    return CurriculumStore.from_env()
@@ -1,34 +1,171 @@
-from crewai import Task
-from typing import List, Dict, Any
-
-def create_objectives_task(agent, course_idea: str, target_audience: str) -> Task:
-    return Task(
-        description=f"""Create 3-5 SMART learning objectives for a course on "{course_idea}" 
-        targeting "{target_audience}". Each objective should use Bloom's taxonomy verbs and be measurable.""",
-        expected_output="A JSON array of 3-5 SMART learning objectives as strings",
-        agent=agent
-    )
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+from .context import compact, module_id
 
-def create_lessons_task(agent, objectives: List[str]) -> Task:
-    return Task(
-        description=f"""Create one detailed lesson blueprint for each of these objectives: {objectives}
-        Each blueprint should include: title, hook, explanation, practice activity, reflection, and estimated time.""",
-        expected_output="A JSON array of lesson blueprints with the specified structure",
-        agent=agent
-    )
+if TYPE_CHECKING:
+    from crewai import Task
+
+# Upstream fields each task actually reads. Prior outputs are passed in this
+# compact canonical form (see src/context.py) instead of as full prose.
+CONTEXT_FIELDS = {
+    "lessons": {"objectives": ("id", "text")},
+    "assessments": {
+        "objectives": ("id", "text"),
+        "lessons": ("id", "objective", "title", "explain", "practice"),
+    },
+    "assessment": {"lessons": ("title", "explain", "practice")},
+    "review": {
+        "objectives": ("id", "text"),
+        "lessons": ("id", "objective", "title", "seat_time"),
+        "assessments": ("lesson", "objective", "mcqs", "mcq_questions", "short_answer"),
+    },
+    # Hierarchical mode: a module sees its neighbours in the outline, and the
+    # course-level review only the per-module verdicts.
+    "module_objectives": {"modules": ("id", "title", "summary")},
+    "course_review": {"modules": ("id", "title", "lessons", "verdict")},
+}
+
+# Every prompt is a byte-stable prefix per task type (instructions and output
+# format) followed by its variable input as one JSON line. The agent's role
+# and backstory come first in the system message, so providers' prefix caches
+# can reuse everything up to "Input:". Nothing that varies per call may go
+# into these texts.
+_LESSON_FORMAT = """Each blueprint is a JSON object with: title, hook (an opening question or scenario), explain (the core
+content), practice (an activity applying it), reflect (a reflection prompt), seat_time (minutes, an integer)
+and modality ("online", "in-person" or "hybrid")."""
+
+_ASSESSMENT_FORMAT = """Each assessment is a JSON object with: lesson_title, objective_measured, mcqs (2 items, each with
+question, options (4 strings), correct (0-based index of the right option) and explanation) and short_answer
+(question, rubric with point allocations, sample_answer)."""
+
+_OBJECTIVES_FORMAT = """Each objective starts with a Bloom's taxonomy verb and is specific, measurable, achievable, relevant and
+time-bound. Answer with a JSON array of 3-5 strings."""
+
+_REVIEW_FORMAT = """Start with PASS or FAIL, then give short notes on what to improve."""
+
+PROMPTS = {
+    "objectives": f"""Create 3-5 SMART learning objectives for the course in the input, written for its target audience.
+{_OBJECTIVES_FORMAT}""",
+    "outline": """Split the course in the input into module_count modules that build on each other without overlapping.
+Give each module a title and a one-sentence summary. Answer with a JSON array of objects with title and summary.""",
+    "module_objectives": f"""Create 3-5 SMART learning objectives for one module of a course: the module in the input's "module"
+field. Its neighbouring modules are listed for context only; do not cover them.
+{_OBJECTIVES_FORMAT}""",
+    "lessons": f"""Create one lesson blueprint for each objective in the input, in the same order.
+{_LESSON_FORMAT}
+Answer with a JSON array of blueprints.""",
+    "lesson": f"""Create one lesson blueprint for the objective in the input.
+{_LESSON_FORMAT}
+Answer with a single JSON object.""",
+    "assessments": f"""Create one assessment for each lesson in the input, in the same order, aligned with the learning objectives.
+{_ASSESSMENT_FORMAT}
+Answer with a JSON array of assessments.""",
+    "assessment": f"""Create one assessment for the lesson in the input. It must measure the objective in the input.
+{_ASSESSMENT_FORMAT}
+Answer with a single JSON object.""",
+    "review": f"""Review the curriculum in the input for alignment and quality. Lessons and assessments reference objectives
+by id. Check that objectives, lessons and assessments are well aligned.
+{_REVIEW_FORMAT}""",
+    # The segments come before the language in the input, so every language
+    # of a batch shares the same prompt prefix.
+    "translation": """Translate every string in the input's "segments" object into the language named in its "language"
+field. Keep the meaning, tone and level, and leave numbers, names, code and markup as they are. Do not add, drop,
+merge or reorder content. A text starting with PASS or FAIL keeps that word in English.
+Answer with a JSON object that maps every key of "segments" to its translation.""",
+    "course_review": f"""Review the course outline in the input. Every module has already been reviewed on its own; the input
+lists their verdicts. Check that the modules progress logically, cover the course without gaps or overlaps,
+and that failed modules are called out.
+{_REVIEW_FORMAT}""",
+}
+
+EXPECTED_OUTPUTS = {
+    "objectives": "A JSON array of 3-5 SMART learning objectives as strings",
+    "outline": "A JSON array of module objects with title and summary",
+    "module_objectives": "A JSON array of 3-5 SMART learning objectives as strings",
+    "lessons": "A JSON array of lesson blueprints with the specified structure",
+    "lesson": "A single JSON object describing the lesson blueprint with the specified structure",
+    "assessments": "A JSON array of assessments with MCQs and short answers",
+    "assessment": "A single JSON object with lesson_title, objective_measured, mcqs and short_answer",
+    "review": "A review summary with PASS/FAIL status and improvement notes",
+    "course_review": "A review summary with PASS/FAIL status and improvement notes",
+    "translation": "A JSON object mapping every segment key to its translation",
+}
+
+def _task(**fields) -> "Task":
+    # crewai is slow to import, so defer it until a task is actually built
+    from crewai import Task
+    return Task(**fields)
 
-def create_assessments_task(agent, lessons: List[Dict[str, Any]]) -> Task:
-    return Task(
-        description=f"""Create assessments for these lessons: {lessons}
-        For each lesson, provide 2 MCQs and 1 short answer question that align with the learning objectives.""",
-        expected_output="A JSON array of assessments with MCQs and short answers",
+def _prompt_task(kind: str, agent, payload: str) -> "Task":
+    return _task(
+        description=f"{PROMPTS[kind]}\n\nInput: {payload}",
+        expected_output=EXPECTED_OUTPUTS[kind],
         agent=agent
     )
 
-def create_review_task(agent, curriculum_data: Dict[str, Any]) -> Task:
-    return Task(
-        description=f"""Review this curriculum for alignment and quality: {curriculum_data}
-        Check if objectives, lessons, and assessments are well-aligned. Provide PASS/FAIL and notes.""",
-        expected_output="A review summary with PASS/FAIL status and improvement notes",
-        agent=agent
+def create_objectives_task(agent, course_idea: str, target_audience: str) -> "Task":
+    return _prompt_task("objectives", agent, compact(
+        {}, values={"course_idea": course_idea, "target_audience": target_audience}
+    ))
+
+def create_lessons_task(agent, objectives: List[str]) -> "Task":
+    return _prompt_task("lessons", agent, compact(CONTEXT_FIELDS["lessons"], objectives=objectives))
+
+def create_assessments_task(agent, lessons: List[Dict[str, Any]],
+                            objectives: Optional[List[str]] = None) -> "Task":
+    return _prompt_task("assessments", agent, compact(
+        CONTEXT_FIELDS["assessments"], objectives=objectives, lessons=lessons
+    ))
+
+def create_review_task(agent, curriculum_data: Dict[str, Any]) -> "Task":
+    values = {"course_idea": curriculum_data["course_idea"], "target_audience": curriculum_data["target_audience"]}
+    sections = {k: v for k, v in curriculum_data.items() if k not in values}
+    return _prompt_task("review", agent, compact(CONTEXT_FIELDS["review"], values=values, **sections))
+
+def create_outline_task(agent, course_idea: str, target_audience: str, modules: int) -> "Task":
+    return _prompt_task("outline", agent, compact(
+        {}, values={"course_idea": course_idea, "target_audience": target_audience, "module_count": modules}
+    ))
+
+def create_module_objectives_task(agent, course_idea: str, target_audience: str,
+                                  outline: List[Dict[str, Any]], index: int) -> "Task":
+    module = {"id": module_id(index), **outline[index], "position": f"{index + 1} of {len(outline)}"}
+    # Only the neighbouring modules, so the prompt does not grow with the course
+    neighbours = [{"id": module_id(i), **outline[i]}
+                  for i in range(max(0, index - 1), min(len(outline), index + 2)) if i != index]
+    return _prompt_task("module_objectives", agent, compact(
+        CONTEXT_FIELDS["module_objectives"],
+        values={"course_idea": course_idea, "target_audience": target_audience, "module": module},
+        modules=neighbours
+    ))
+
+def create_course_review_task(agent, course_idea: str, target_audience: str,
+                              modules: List[Dict[str, Any]]) -> "Task":
+    return _prompt_task("course_review", agent, compact(
+        CONTEXT_FIELDS["course_review"], max_chars=120,
+        values={"course_idea": course_idea, "target_audience": target_audience}, modules=modules
+    ))
+
+def create_lesson_task(agent, objective: str) -> "Task":
+    return _prompt_task("lesson", agent, compact({}, values={"objective": objective}))
+
+def create_assessment_task(agent, lesson: Dict[str, Any], objective: str) -> "Task":
+    return _prompt_task("assessment", agent, compact(
+        CONTEXT_FIELDS["assessment"], values={"objective": objective}, lessons=[lesson]
+    ))
+
+def create_translation_task(agent, language: str, segments: List[str]) -> "Task":
+    return _prompt_task("translation", agent, compact(
+        {}, values={"segments": {str(i): text for i, text in enumerate(segments, 1)}, "language": language}
+    ))
+
+def create_repair_task(task: "Task", previous_output: str, problem: str) -> "Task":
+    """Re-ask a single task after its output failed to parse or validate."""
+    previous = f"\n        Previous answer (may be truncated): {previous_output[:2000]}" if previous_output else ""
+    return _task(
+        description=f"""{task.description}
+
+        Your previous answer could not be used: {problem}{previous}
+        Return only the corrected JSON, with no commentary or code fences.""",
+        expected_output=task.expected_output,
+        agent=task.agent
     )
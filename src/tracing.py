@@ -0,0 +1,271 @@
+"""
+Per-agent tracing and metrics for curriculum runs.
+
+Every ``generate_curriculum`` call opens a ``run`` span, every agent task a
+``task`` span and every LLM request an ``llm`` span, each with wall time,
+queue time (for pool work), token counts, model and cache-hit flag. Finished
+spans go to pluggable exporters:
+
+- ``TRACE_JSONL=traces.jsonl`` appends one JSON object per span
+- ``TRACE_PROMETHEUS_PORT=9464`` serves aggregated metrics at ``/metrics``
+- ``TRACE_PROFILE=cprofile,tracemalloc`` profiles each run into ``TRACE_PROFILE_DIR``
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "root",
+                 "start", "end", "queue_ms", "attributes", "_lock")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"] = None, **attributes: Any):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.root = parent.root if parent else self
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.queue_ms: Optional[float] = None
+        self.attributes: Dict[str, Any] = attributes
+        self._lock = threading.Lock()
+
+    @property
+    def wall_ms(self) -> Optional[float]:
+        return None if self.end is None else (self.end - self.start) * 1000
+
+    def set(self, **attributes: Any) -> None:
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "wall_ms": self.wall_ms,
+            "queue_ms": self.queue_ms,
+            **self.attributes,
+        }
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+# perf_counter() at which pool work was submitted; consumed by the next task span.
+_enqueued_at: ContextVar[Optional[float]] = ContextVar("enqueued_at", default=None)
+
+
+def mark_enqueued(submitted: float) -> None:
+    _enqueued_at.set(submitted)
+
+
+class JsonlExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class PrometheusExporter:
+    """Aggregates spans into Prometheus text-format histograms and counters."""
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], List[float]] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def export(self, span: Span) -> None:
+        label = str(span.attributes.get("agent") or span.attributes.get("role") or span.name)
+        key = (span.kind, label)
+        seconds = (span.wall_ms or 0) / 1000
+        with self._lock:
+            counts = self._histograms.setdefault(key, [0] * (len(self.BUCKETS) + 2))
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    counts[i] += 1
+            counts[-2] += 1        # +Inf / count
+            counts[-1] += seconds  # sum
+            labels = (("kind", span.kind), ("name", label))
+            for direction in ("input", "output", "cached_input"):
+                tokens = span.attributes.get(f"{direction}_tokens")
+                if tokens:
+                    self._add("curriculum_tokens_total", labels + (("direction", direction),), tokens)
+            if span.queue_ms is not None:
+                self._add("curriculum_queue_seconds_total", labels, span.queue_ms / 1000)
+            if span.attributes.get("cache_hit"):
+                self._add("curriculum_llm_cache_hits_total", labels, 1)
+            if span.attributes.get("error"):
+                self._add("curriculum_span_errors_total", labels, 1)
+            if span.attributes.get("retries"):
+                self._add("curriculum_retries_total", labels, span.attributes["retries"])
+
+    def _add(self, metric: str, labels, amount: float) -> None:
+        self._counters[(metric, labels)] = self._counters.get((metric, labels), 0) + amount
+
+    def render(self) -> str:
+        lines = ["# TYPE curriculum_span_seconds histogram"]
+        with self._lock:
+            for (kind, name), counts in sorted(self._histograms.items()):
+                labels = f'kind="{kind}",name="{_escape(name)}"'
+                for bound, count in zip(self.BUCKETS, counts):
+                    lines.append(f'curriculum_span_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'curriculum_span_seconds_bucket{{{labels},le="+Inf"}} {counts[-2]}')
+                lines.append(f"curriculum_span_seconds_count{{{labels}}} {counts[-2]}")
+                lines.append(f"curriculum_span_seconds_sum{{{labels}}} {counts[-1]:.6f}")
+            seen = set()
+            for (metric, labels), value in sorted(self._counters.items()):
+                if metric not in seen:
+                    lines.append(f"# TYPE {metric} counter")
+                    seen.add(metric)
+                rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{metric}{{{rendered}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        return self._server
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+class Tracer:
+    def __init__(self, exporters=None, profile: str = "", profile_dir: str = "profiles"):
+        self.exporters = list(exporters or [])
+        self.profile = {p.strip() for p in profile.split(",") if p.strip()}
+        self.profile_dir = profile_dir
+
+    def start_span(self, name: str, kind: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        span = Span(name, kind, parent if parent is not None else current_span.get(), **attributes)
+        enqueued = _enqueued_at.get()
+        if kind == "task" and enqueued is not None:
+            span.queue_ms = (time.perf_counter() - enqueued) * 1000
+            _enqueued_at.set(None)
+        return span
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        if span.end is not None:
+            return
+        span.end = time.time()
+        if error is not None:
+            span.set(error=f"{type(error).__name__}: {error}")
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:  # tracing must never break a run
+                print(f"⚠️ Trace export failed: {e}")
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attributes: Any):
+        span = self.start_span(name, kind, **attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        finally:
+            current_span.reset(token)
+            self.end_span(span)
+
+    @contextmanager
+    def profiled(self, span: Span):
+        """Optionally capture cProfile stats and tracemalloc peaks for one run (calling thread only)."""
+        profiler = None
+        if "cprofile" in self.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        tracing_memory = "tracemalloc" in self.profile
+        if tracing_memory:
+            import tracemalloc
+            started_tracemalloc = not tracemalloc.is_tracing()
+            if started_tracemalloc:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                path = os.path.join(self.profile_dir, f"run-{span.trace_id}.prof")
+                profiler.dump_stats(path)
+                span.set(profile_path=path)
+            if tracing_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                span.set(memory_peak_bytes=peak, memory_current_bytes=current)
+                if started_tracemalloc:
+                    tracemalloc.stop()
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer configured from TRACE_* environment variables."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                exporters = []
+                if os.getenv("TRACE_JSONL"):
+                    exporters.append(JsonlExporter(os.environ["TRACE_JSONL"]))
+                if os.getenv("TRACE_PROMETHEUS_PORT"):
+                    prometheus = PrometheusExporter()
+                    prometheus.serve(int(os.environ["TRACE_PROMETHEUS_PORT"]))
+                    exporters.append(prometheus)
+                _tracer = Tracer(
+                    exporters,
+                    profile=os.getenv("TRACE_PROFILE", ""),
+                    profile_dir=os.getenv("TRACE_PROFILE_DIR", "profiles"),
+                )
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """Install a tracer programmatically, e.g. with in-process exporters for tests or benchmarks."""
+    global _tracer
+    _tracer = tracer
@@ -0,0 +1,85 @@
+"""
+Translated variants of a finished curriculum.
+
+Only the text is translated. The structure is copied unchanged:
+- the number and order of objectives, lessons, assessments, MCQ options and modules
+- every ``correct`` index, ``seat_time``, ``modality`` and module size
+
+So all variants of a syllabus line up item for item.
+
+``text_segments`` collects the distinct strings of a curriculum. A lesson
+title repeated as its assessment's ``lesson_title`` is translated once, and
+so reads the same in both places. ``batch_segments`` packs the strings into
+a few large requests. ``apply_translations`` builds the variant from the
+translated strings. ``CurriculumCrew.translate`` runs the requests.
+"""
+
+from typing import Callable, List, Sequence
+
+from .config import CurriculumOutput
+from .models import MCQ, Assessment, Lesson, Module, ShortAnswer
+
+# Characters of source text per translation request (TRANSLATION_BATCH_CHARS)
+BATCH_CHARS = 6000
+
+
+def map_text(curriculum: CurriculumOutput, fn: Callable[[str], str]) -> CurriculumOutput:
+    """A copy of ``curriculum`` with ``fn`` applied to every translatable string and everything else kept."""
+    def lesson(l: Lesson) -> Lesson:
+        return Lesson(fn(l.title), fn(l.hook), fn(l.explain), fn(l.practice), fn(l.reflect),
+                      l.seat_time, l.modality)
+
+    def assessment(a: Assessment) -> Assessment:
+        mcqs = [MCQ(fn(m.question), [fn(option) for option in m.options], m.correct, fn(m.explanation))
+                for m in a.mcqs]
+        short_answer = a.short_answer
+        if short_answer is not None:
+            short_answer = ShortAnswer(fn(short_answer.question), fn(short_answer.rubric),
+                                       fn(short_answer.sample_answer))
+        return Assessment(fn(a.lesson_title), fn(a.objective_measured), mcqs, short_answer)
+
+    return curriculum.model_copy(update={
+        "course_idea": fn(curriculum.course_idea),
+        "target_audience": fn(curriculum.target_audience),
+        "learning_objectives": [fn(objective) for objective in curriculum.learning_objectives],
+        "lesson_blueprints": [lesson(l) for l in curriculum.lesson_blueprints],
+        "assessments": [assessment(a) for a in curriculum.assessments],
+        "review_notes": fn(curriculum.review_notes),
+        "modules": [Module(fn(m.title), fn(m.summary), m.size, fn(m.review_notes)) for m in curriculum.modules],
+    })
+
+
+def text_segments(curriculum: CurriculumOutput) -> List[str]:
+    """The distinct non-blank strings of ``curriculum``, in document order."""
+    seen = {}
+
+    def collect(text: str) -> str:
+        if text and text.strip():
+            seen.setdefault(text, None)
+        return text
+
+    map_text(curriculum, collect)
+    return list(seen)
+
+
+def batch_segments(texts: Sequence[str], max_chars: int = BATCH_CHARS) -> List[List[str]]:
+    """Consecutive runs of ``texts`` of about ``max_chars`` each; a longer string gets a batch of its own."""
+    batches, current, size = [], [], 0
+    for text in texts:
+        if current and size + len(text) > max_chars:
+            batches.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def apply_translations(curriculum: CurriculumOutput, texts: Sequence[str], translated: Sequence[str],
+                       language: str) -> CurriculumOutput:
+    """The ``language`` variant of ``curriculum``, given the translation of each of ``texts``."""
+    lookup = dict(zip(texts, translated))
+    variant = map_text(curriculum, lambda text: lookup.get(text, text))
+    variant.language = language
+    return variant
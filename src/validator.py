@@ -0,0 +1,216 @@
+"""
+Deterministic local alignment checks for a generated curriculum.
+
+Most of what the reviewer agent verifies is mechanical, so it is checked here
+without an LLM:
+
+- every objective has a lesson and an assessment
+- every assessment has 2 MCQs with ``correct`` inside ``options`` and a short answer
+- every objective uses a Bloom's taxonomy verb
+- lesson ``seat_time`` values are sane
+- each objective is lexically closest to its own lesson and assessment
+  (TF-IDF cosine similarity, computed as one NumPy matrix product)
+
+The checks are folded into a score in [0, 1]. With ``REVIEW_MODE=auto`` the
+LLM reviewer only runs when that score is borderline (see ``CurriculumCrew``).
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+BLOOM_VERBS = frozenset("""
+    define list recall recognize identify name state describe explain summarize classify
+    compare contrast interpret paraphrase illustrate discuss apply demonstrate implement use
+    solve execute calculate operate practice analyze differentiate distinguish examine
+    organize investigate categorize deconstruct evaluate assess justify critique judge
+    defend prioritize recommend argue appraise create design develop construct formulate
+    propose compose plan produce build devise
+""".split())
+
+STOPWORDS = frozenset("""
+    the and for with that this from into their they them will able can are was were
+    about how what when which who why your you our its has have had not but all any
+    each more most other some such than then there these those use using used
+""".split())
+
+MCQS_PER_ASSESSMENT = 2
+SEAT_TIME_RANGE = (10, 240)
+# An objective counts as covered when its own lesson/assessment is the most
+# similar one, or at least this similar in absolute terms.
+COVERAGE_MIN_SIMILARITY = 0.2
+
+
+def review_thresholds():
+    """(pass, fail) score thresholds; scores in between are borderline."""
+    return (
+        float(os.getenv("REVIEW_PASS_SCORE", "0.9")),
+        float(os.getenv("REVIEW_FAIL_SCORE", "0.6")),
+    )
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in re.findall(r"[a-z]+", text.lower()) if len(t) > 2 and t not in STOPWORDS]
+
+
+def tfidf_matrix(documents: Sequence[str]) -> np.ndarray:
+    """L2-normalized TF-IDF rows, one per document, over the documents' own vocabulary."""
+    tokenized = [_tokens(d) for d in documents]
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for row, tokens in enumerate(tokenized):
+        for token in tokens:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+    counts = np.zeros((len(documents), max(len(vocabulary), 1)))
+    np.add.at(counts, (np.array(rows, dtype=int), np.array(cols, dtype=int)), 1)
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(documents)) / (1 + df)) + 1
+    weights = counts * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+
+
+def similarity_matrix(queries: Sequence[str], documents: Sequence[str]) -> np.ndarray:
+    """Cosine similarity of every query against every document, shape (len(queries), len(documents))."""
+    if not queries or not documents:
+        return np.zeros((len(queries), len(documents)))
+    matrix = tfidf_matrix(list(queries) + list(documents))
+    return matrix[: len(queries)] @ matrix[len(queries):].T
+
+
+def _lesson_text(lesson: Dict[str, Any]) -> str:
+    return " ".join(str(lesson.get(k, "")) for k in ("title", "hook", "explain", "practice", "reflect"))
+
+
+def _assessment_text(assessment: Dict[str, Any]) -> str:
+    parts = [str(assessment.get("objective_measured", ""))]
+    for mcq in assessment.get("mcqs") or []:
+        parts.append(str(mcq.get("question", "")))
+        parts.extend(str(o) for o in mcq.get("options") or [])
+    short_answer = assessment.get("short_answer") or {}
+    parts.append(str(short_answer.get("question", "")))
+    return " ".join(parts)
+
+
+def _coverage(similarity: np.ndarray) -> np.ndarray:
+    n = min(similarity.shape) if similarity.size else 0
+    if n == 0:
+        return np.zeros(similarity.shape[0], dtype=bool)
+    covered = np.zeros(similarity.shape[0], dtype=bool)
+    diagonal = similarity[np.arange(n), np.arange(n)]
+    covered[:n] = (similarity[:n].argmax(axis=1) == np.arange(n)) | (diagonal >= COVERAGE_MIN_SIMILARITY)
+    return covered
+
+
+@dataclass
+class ValidationReport:
+    score: float
+    verdict: str  # "PASS", "FAIL" or "BORDERLINE"
+    checks: Dict[str, float]
+    issues: List[str] = field(default_factory=list)
+    lesson_similarity: List[List[float]] = field(default_factory=list)
+    assessment_similarity: List[List[float]] = field(default_factory=list)
+
+    def to_notes(self) -> str:
+        lines = [f"Local alignment check: {self.verdict} (score {self.score:.2f})"]
+        lines += [f"- {name}: {value:.0%}" for name, value in self.checks.items()]
+        lines += [f"- ⚠️ {issue}" for issue in self.issues]
+        return "\n".join(lines)
+
+
+def validate_curriculum(objectives: Sequence[str], lessons: Sequence[Dict[str, Any]],
+                        assessments: Sequence[Dict[str, Any]]) -> ValidationReport:
+    n = len(objectives)
+    issues: List[str] = []
+    lessons = [lesson or {} for lesson in lessons]
+    assessments = [assessment or {} for assessment in assessments]
+
+    has_lesson = np.array([i < len(lessons) and bool(lessons[i].get("title")) for i in range(n)], dtype=bool)
+    has_assessment = np.array([i < len(assessments) and bool(assessments[i]) for i in range(n)], dtype=bool)
+
+    mcq_counts = np.array([len(a.get("mcqs") or []) for a in assessments], dtype=int)
+    short_answers = np.array([
+        bool((a.get("short_answer") or {}).get("question")) and bool((a.get("short_answer") or {}).get("rubric"))
+        for a in assessments
+    ], dtype=bool)
+    mcqs = [m for a in assessments for m in a.get("mcqs") or []]
+    correct = np.array([m.get("correct", -1) if isinstance(m.get("correct"), int) else -1 for m in mcqs], dtype=int)
+    option_counts = np.array([len(m.get("options") or []) for m in mcqs], dtype=int)
+    correct_in_range = (correct >= 0) & (correct < option_counts)
+
+    bloom = np.array([any(t in BLOOM_VERBS for t in re.findall(r"[a-z]+", o.lower())) for o in objectives], dtype=bool)
+    seat_times = np.array([lesson.get("seat_time", 0) or 0 for lesson in lessons], dtype=float)
+    low, high = SEAT_TIME_RANGE
+    seat_time_ok = (seat_times >= low) & (seat_times <= high)
+
+    lesson_similarity = similarity_matrix(objectives, [_lesson_text(l) for l in lessons])
+    assessment_similarity = similarity_matrix(objectives, [_assessment_text(a) for a in assessments])
+    lesson_coverage = _coverage(lesson_similarity)
+    assessment_coverage = _coverage(assessment_similarity)
+
+    def fraction(mask: np.ndarray) -> float:
+        return float(mask.mean()) if mask.size else 1.0
+
+    checks = {
+        "objectives with a lesson": fraction(has_lesson),
+        "objectives with an assessment": fraction(has_assessment),
+        "assessments with 2 MCQs": fraction(mcq_counts == MCQS_PER_ASSESSMENT),
+        "assessments with a short answer": fraction(short_answers),
+        "MCQ answers inside options": fraction(correct_in_range),
+        "objectives with a Bloom verb": fraction(bloom),
+        "lessons with sane seat time": fraction(seat_time_ok),
+        "objectives covered by their lesson": fraction(lesson_coverage),
+        "objectives covered by their assessment": fraction(assessment_coverage),
+    }
+
+    for i in np.flatnonzero(~has_lesson):
+        issues.append(f"objective {i + 1} has no lesson")
+    for i in np.flatnonzero(~has_assessment):
+        issues.append(f"objective {i + 1} has no assessment")
+    for i in np.flatnonzero(mcq_counts != MCQS_PER_ASSESSMENT):
+        issues.append(f"assessment {i + 1} has {mcq_counts[i]} MCQs instead of {MCQS_PER_ASSESSMENT}")
+    for i in np.flatnonzero(~short_answers):
+        issues.append(f"assessment {i + 1} is missing a short answer question or rubric")
+    if not correct_in_range.all():
+        issues.append(f"{int((~correct_in_range).sum())} MCQ(s) point at an option that does not exist")
+    for i in np.flatnonzero(~bloom):
+        issues.append(f"objective {i + 1} has no measurable Bloom's verb")
+    for i in np.flatnonzero(~seat_time_ok):
+        issues.append(f"lesson {i + 1} seat time {seat_times[i]:g} min is outside {low}-{high}")
+    for i in np.flatnonzero(~lesson_coverage):
+        issues.append(f"objective {i + 1} is not clearly covered by lesson {i + 1}")
+    for i in np.flatnonzero(~assessment_coverage):
+        issues.append(f"objective {i + 1} is not clearly measured by assessment {i + 1}")
+
+    score = float(np.mean(list(checks.values()))) if n else 0.0
+    # Missing items or impossible answers are never a pass, however good the rest is.
+    hard_failure = not (has_lesson.all() and has_assessment.all() and correct_in_range.all())
+    pass_score, fail_score = review_thresholds()
+    if hard_failure or score < fail_score:
+        verdict = "FAIL"
+    elif score >= pass_score:
+        verdict = "PASS"
+    else:
+        verdict = "BORDERLINE"
+
+    return ValidationReport(
+        score=round(score, 4),
+        verdict=verdict,
+        checks=checks,
+        issues=issues,
+        lesson_similarity=np.round(lesson_similarity, 4).tolist(),
+        assessment_similarity=np.round(assessment_similarity, 4).tolist(),
+    )
+
+
+def validate_output(curriculum) -> ValidationReport:
+    """Run the local checks over a ``CurriculumOutput``."""
+    return validate_curriculum(
+        curriculum.learning_objectives,
+        [lesson.to_dict() for lesson in curriculum.lesson_blueprints],
+        [assessment.to_dict() for assessment in curriculum.assessments],
+    )